@@ -4,6 +4,7 @@ import logging
 import discord
 
 from configurations import CONFIG
+from embed_fields import split_lines_into_fields
 
 LOGLEVEL = logging.DEBUG
 
@@ -52,17 +53,12 @@ class BaseBot(discord.Client):
             log.debug(f'Reconnected at {self.bot_connect}, increased downtime by {added_downtime} to {self.downtimes}.')
 
     async def generate_embed_from_text(self, message_lines, title, subtitle):
+        return self.generate_embed_from_fields(title, split_lines_into_fields(message_lines, subtitle))
+
+    def generate_embed_from_fields(self, title, fields):
         e = discord.Embed(title=title, color=self.WHITE)
-        message_text = ''
-        field_title = subtitle
-        for line in message_lines:
-            if len(field_title) + len(message_text) + len(line) + len('``````') > 1024:
-                e.add_field(name=field_title, value=f'```{message_text}```', inline=False)
-                message_text = f'{line}\n'
-                field_title = 'Continuation'
-            else:
-                message_text += f'{line}\n'
-        e.add_field(name=field_title, value=f'```{message_text}```')
+        for field in fields:
+            e.add_field(**field)
         return e
 
     def generate_permissions(self):
@@ -0,0 +1,480 @@
+#!/usr/bin/env python3
+import argparse
+import contextlib
+import multiprocessing
+import random
+import re
+import resource
+import sys
+import time
+import tracemalloc
+
+from jinja2 import Environment, FileSystemLoader
+
+import search
+import search_index
+import translations
+from data_source.base_game_data import BaseGameData
+from data_source.game_data import GameData
+from game_assets import GameAssets
+from search import TeamExpander, _
+from util import flatten
+from views import Views
+
+
+def percentile(timings, percent):
+    ordered = sorted(timings)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * percent / 100))]
+
+
+def print_timings(title, timings):
+    print(f'{title:<30} n={len(timings):<6} '
+          f'p50={percentile(timings, 50) * 1000:.3f}ms '
+          f'p99={percentile(timings, 99) * 1000:.3f}ms '
+          f'max={max(timings) * 1000:.3f}ms')
+
+
+def add_typo(word):
+    position = random.randrange(len(word))
+    typo = random.choice(('delete', 'duplicate', 'swap'))
+    if typo == 'delete':
+        return word[:position] + word[position + 1:]
+    if typo == 'duplicate':
+        return word[:position] + word[position] + word[position:]
+    return word[:position] + word[position + 1:position + 2] + word[position] + word[position + 2:]
+
+
+def benchmark_fuzzy_search(expander):
+    random.seed(0)
+    for kind in expander.FUZZY_SEARCH_KINDS:
+        timings = []
+        found = 0
+        for lang in translations.LANGUAGES:
+            index = expander.get_search_index(kind, lang)
+            for _id in index.tags:
+                search_term = add_typo(index.get_name(_id))
+                start = time.perf_counter()
+                matches = index.fuzzy_search(search_term)
+                timings.append(time.perf_counter() - start)
+                found += _id in matches
+        print_timings(f'fuzzy {kind} ({found} found)', timings)
+
+
+def legacy_extract_search_tag(search_term):
+    ignored_characters = ' -\'’'
+    for char in ignored_characters:
+        search_term = search_term.replace(char, '')
+    return search_term.lower()
+
+
+def legacy_search_talent(expander, search_term, lang):
+    possible_matches = []
+    for tree in expander.talent_trees.values():
+        translated_name = legacy_extract_search_tag(_(tree['name'], lang))
+        translated_talents = [_(t['name'], lang) for t in tree['talents']]
+        talents_search_tags = [legacy_extract_search_tag(t) for t in translated_talents]
+        real_search = legacy_extract_search_tag(search_term)
+        if real_search == translated_name or real_search in talents_search_tags:
+            result = tree.copy()
+            expander.translate_talent_tree(result, lang)
+            return [result]
+        elif real_search in translated_name:
+            result = tree.copy()
+            expander.translate_talent_tree(result, lang)
+            possible_matches.append(result)
+        else:
+            talent_matches = [t for t in talents_search_tags if real_search in t]
+            if talent_matches:
+                result = tree.copy()
+                result['talent_matches'] = talent_matches
+                expander.translate_talent_tree(result, lang)
+                possible_matches.append(result)
+    return sorted(possible_matches, key=lambda tree: tree['name'])
+
+
+def legacy_search_traitstone(expander, search_term, lang):
+    real_search = legacy_extract_search_tag(search_term)
+    result = []
+    for traitstone_name in expander.traitstones:
+        translated_traitstone = expander.translate_entity('traitstone', traitstone_name, lang)
+        if real_search in legacy_extract_search_tag(translated_traitstone['name']):
+            result.append(translated_traitstone)
+    return sorted(result, key=lambda traitstone: traitstone['name'])
+
+
+@contextlib.contextmanager
+def legacy_search_tags():
+    extract_search_tag = search_index.extract_search_tag
+    search.extract_search_tag = search_index.extract_search_tag = legacy_extract_search_tag
+    try:
+        yield
+    finally:
+        search.extract_search_tag = search_index.extract_search_tag = extract_search_tag
+
+
+def get_search_queries(expander, kind, lang):
+    if kind == 'talent':
+        names = [_(talent['name'], lang) for tree in expander.talent_trees.values() for talent in tree['talents']]
+    elif kind == 'traitstone':
+        names = [_(traitstone['name'], lang) for traitstone in expander.traitstones.values()]
+    else:
+        names = [_(entity.name, lang) for entity in getattr(expander, expander.ENTITY_KINDS[kind]).values()]
+    return [name for name in names if len(name) > 3] + [name[1:4] for name in names if len(name) > 3]
+
+
+def benchmark_search_path(expander):
+    random.seed(1)
+    searches = {
+        'troop': (expander.search_troop, expander.search_troop),
+        'kingdom': (expander.search_kingdom, expander.search_kingdom),
+        'pet': (expander.search_pet, expander.search_pet),
+        'weapon': (expander.search_weapon, expander.search_weapon),
+        'talent': (lambda term, lang: legacy_search_talent(expander, term, lang), expander.search_talent),
+        'traitstone': (lambda term, lang: legacy_search_traitstone(expander, term, lang), expander.search_traitstone),
+    }
+    for kind, (legacy_search, current_search) in searches.items():
+        queries = [(query, lang) for lang in translations.LANGUAGES
+                   for query in get_search_queries(expander, kind, lang)]
+        queries = random.sample(queries, min(len(queries), 2000))
+        for query, lang in queries:
+            current_search(query, lang)
+        mismatches = 0
+        legacy_timings = []
+        current_timings = []
+        for query, lang in queries:
+            with legacy_search_tags():
+                start = time.perf_counter()
+                expected = legacy_search(query, lang)
+                legacy_timings.append(time.perf_counter() - start)
+
+            start = time.perf_counter()
+            result = current_search(query, lang)
+            current_timings.append(time.perf_counter() - start)
+            mismatches += result != expected
+        print_timings(f'legacy {kind} search', legacy_timings)
+        print_timings(f'{kind} search ({mismatches} differ)', current_timings)
+
+
+def legacy_translate_spell(spell, lang):
+    magic = _('[MAGIC]', lang)
+
+    description = _(spell['description'], lang)
+
+    for i, (multiplier, amount) in enumerate(spell['effects'], start=1):
+        spell_amount = f' + {amount}' if amount else ''
+        multiplier_text = ''
+        if multiplier > 1:
+            if multiplier == int(multiplier):
+                multiplier_text = f'{multiplier:.0f} ⨯ '
+            else:
+                multiplier_text = f'{multiplier} ⨯ '
+        divisor = ''
+        if multiplier < 1:
+            number = int(round(1 / multiplier))
+            divisor = f' / {number}'
+        damage = f'[{multiplier_text}{magic}{divisor}{spell_amount}]'
+        number_of_replacements = len(re.findall(r'\{\d\}', description))
+        has_half_replacement = len(spell['effects']) == number_of_replacements - 1
+        if '{2}' in description and has_half_replacement:
+            multiplier *= 0.5
+            amount *= 0.5
+            if amount == int(amount):
+                amount = int(amount)
+            half_damage = f'[{multiplier} ⨯ {magic}{divisor} + {amount}]'
+            description = description.replace('{1}', half_damage)
+            description = description.replace('{2}', damage)
+        else:
+            description = description.replace(f'{{{i}}}', damage)
+
+    boost = ''
+    if spell['boost'] and spell['boost'] > 100:
+        boost = f' [x{int(round(spell["boost"] / 100))}]'
+    elif spell['boost'] and spell['boost'] != 1 and spell['boost'] <= 100:
+        boost = f' [{100 / spell["boost"]:0.0f}:1]'
+
+    description = f'{description}{boost}'
+
+    return {
+        'name': _(spell['name'], lang),
+        'cost': spell['cost'],
+        'description': description,
+    }
+
+
+def benchmark_spell_templates(expander):
+    legacy_timings = []
+    template_timings = []
+    mismatches = 0
+    for lang in translations.LANGUAGES:
+        for spell_id, spell in expander.spells.items():
+            start = time.perf_counter()
+            expected = legacy_translate_spell(spell, lang)
+            legacy_timings.append(time.perf_counter() - start)
+
+            start = time.perf_counter()
+            rendered = expander.translate_spell(spell_id, lang)
+            template_timings.append(time.perf_counter() - start)
+
+            if rendered != expected:
+                mismatches += 1
+                print(f'Spell {spell_id} ({lang}) differs:\n  {expected}\n  {rendered}')
+    print_timings('legacy translate_spell', legacy_timings)
+    print_timings('spell templates', template_timings)
+    if mismatches:
+        sys.exit(f'{mismatches} of {len(template_timings)} rendered spells differ.')
+    print(f'All {len(template_timings)} rendered spells match.')
+
+
+def get_peak_rss():
+    return get_memory_status('VmHWM:') or resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def get_rss():
+    return get_memory_status('VmRSS:')
+
+
+def get_memory_status(field):
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith(field):
+                    return int(line.split()[1]) / 1024
+    except FileNotFoundError:
+        pass
+    return 0
+
+
+def load_nothing():
+    return get_peak_rss()
+
+
+def load_world_json():
+    data = GameAssets.load('World.json')
+    world = GameData()
+    world.populate_world_data(data.items())
+    world.data = data
+    return get_peak_rss()
+
+
+def stream_world_json():
+    world = GameData()
+    world.populate_world_data()
+    return get_peak_rss()
+
+
+def benchmark_world_json_memory(expander):
+    context = multiprocessing.get_context('spawn')
+    for title, loader in (('baseline', load_nothing),
+                          ('json.load World.json', load_world_json),
+                          ('streamed World.json', stream_world_json)):
+        with context.Pool(1) as pool:
+            print(f'{title:<30} peak RSS {pool.apply(loader):.1f} MiB')
+
+
+def load_translations():
+    rows = []
+    shared = translations.Translations()
+    for lang_code in translations.LANGUAGES:
+        rss = get_rss()
+        start = time.perf_counter()
+        shared.get('[TROOPS]', lang_code)
+        rows.append((lang_code, time.perf_counter() - start, get_rss() - rss))
+    return rows, get_rss()
+
+
+def benchmark_translations(expander):
+    context = multiprocessing.get_context('spawn')
+    with context.Pool(1) as pool:
+        baseline = pool.apply(get_rss)
+    with context.Pool(1) as pool:
+        rows, rss = pool.apply(load_translations)
+    for lang_code, load_time, rss_increase in rows:
+        print(f'{lang_code:<4} loaded in {load_time * 1000:>6.1f}ms  RSS +{rss_increase:.1f} MiB')
+    print(f'total {sum(row[1] for row in rows) * 1000:.1f}ms, RSS +{rss - baseline:.1f} MiB over baseline')
+
+
+class DictTranslations:
+    def __init__(self):
+        self._translations = {}
+        tables = {}
+        for lang_code, language in translations.LANGUAGES.items():
+            if language not in tables:
+                tables[language] = GameAssets.load(f'GemsOfWar_{language}.json')
+            self._translations[lang_code] = tables[language]
+
+    def get(self, key, lang=''):
+        if lang not in self._translations:
+            lang = translations.Translations.BASE_LANG
+
+        return self._translations[lang].get(key, key)
+
+
+def load_translation_storage(storage):
+    tracemalloc.start()
+    store = storage()
+    for lang_code in translations.LANGUAGES:
+        store.get('[TROOPS]', lang_code)
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return size / 1024 / 1024
+
+
+def benchmark_translation_storage(expander):
+    context = multiprocessing.get_context('spawn')
+    for title, storage in (('dict per language', DictTranslations),
+                           ('shared key slots', translations.Translations)):
+        with context.Pool(1) as pool:
+            print(f'{title:<30} {pool.apply(load_translation_storage, (storage,)):.1f} MiB allocated')
+
+    keys = [entity.name for container in ('troops', 'kingdoms', 'traits', 'spells') for entity in
+            getattr(expander.world, container).values()]
+    keys += [f'[TROOPTYPE_{_type.upper()}]' for troop in expander.troops.values() for _type in troop.get('types', ())]
+    keys += [f'[MISSING_KEY_{i}]' for i in range(len(keys) // 20)]
+    random.seed(5)
+    lookups = [(random.choice(keys), random.choice(list(translations.LANGUAGES) + ['xx'])) for _ in range(100000)]
+    for title, store in (('dict per language', DictTranslations()),
+                         ('shared key slots', translations.Translations())):
+        get = store.get
+        for key, lang in lookups:
+            get(key, lang)
+        timings = []
+        for _ in range(5):
+            start = time.perf_counter()
+            for key, lang in lookups:
+                get(key, lang)
+            timings.append(time.perf_counter() - start)
+        print(f'{title:<30} {len(lookups) / min(timings) / 1e6:.2f}M lookups/s')
+
+
+def legacy_render_embed(views, jinja_env, template_name, **kwargs):
+    jinja_env.filters['emoji'] = views.my_emojis.get
+    jinja_env.filters['banner_colors'] = views.banner_colors
+    jinja_env.globals.update({
+        'emoji': views.my_emojis.get,
+        'flatten': flatten
+    })
+    template = jinja_env.get_template(template_name)
+    return template.render(**kwargs)
+
+
+def benchmark_template_rendering(expander):
+    start = time.perf_counter()
+    views = Views(emojis={})
+    print(f'{len(views.templates)} templates compiled in {time.perf_counter() - start:.3f}s.')
+    jinja_env = Environment(loader=FileSystemLoader('templates'))
+    troop_ids = [troop.id for troop in expander.troops.values() if troop.name != '`?`'][:200]
+    troops = [expander.translate_entity('troop', troop_id, lang) for troop_id in troop_ids for lang in ('en', 'de')]
+    for template_name in ('troop.jinja', 'troop_shortened.jinja'):
+        legacy_timings = []
+        timings = []
+        for troop in troops:
+            start = time.perf_counter()
+            expected = legacy_render_embed(views, jinja_env, template_name, troop=troop)
+            legacy_timings.append(time.perf_counter() - start)
+
+            start = time.perf_counter()
+            rendered = views.templates[template_name].render(troop=troop)
+            timings.append(time.perf_counter() - start)
+            assert rendered == expected
+        print_timings(f'legacy {template_name}', legacy_timings)
+        print_timings(f'preloaded {template_name}', timings)
+
+
+ENTITY_CONTAINERS = ('troops', 'spells', 'weapons', 'traits', 'kingdoms', 'pets', 'classes')
+
+
+def get_deep_size(root):
+    seen = set()
+    size = 0
+    stack = [root]
+    while stack:
+        obj = stack.pop()
+        if id(obj) in seen:
+            continue
+        seen.add(id(obj))
+        size += sys.getsizeof(obj)
+        if isinstance(obj, dict):
+            stack.extend(obj.keys())
+            stack.extend(obj.values())
+        elif isinstance(obj, (list, tuple, set)):
+            stack.extend(obj)
+        elif isinstance(obj, BaseGameData):
+            stack.extend(getattr(obj, slot) for slot in obj.__slots__ if hasattr(obj, slot))
+    return size
+
+
+def as_plain_dicts(value, converted):
+    if isinstance(value, BaseGameData):
+        if id(value) not in converted:
+            converted[id(value)] = {}
+            converted[id(value)].update({k: as_plain_dicts(v, converted) for k, v in value.items()})
+        return converted[id(value)]
+    if isinstance(value, (list, tuple)):
+        return [as_plain_dicts(v, converted) for v in value]
+    return value
+
+
+def print_sizes(title, record_size, dict_size):
+    print(f'{title:<30} records {record_size / 1024:>9.1f} KiB  dicts {dict_size / 1024:>9.1f} KiB  '
+          f'({(1 - record_size / dict_size) * 100:.0f}% less)')
+
+
+def time_access(entities, get_fields):
+    start = time.perf_counter()
+    for _ in range(100):
+        for entity in entities:
+            get_fields(entity)
+    return time.perf_counter() - start
+
+
+def benchmark_entity_memory(expander):
+    converted = {}
+    all_records = []
+    all_dicts = []
+    for container in ENTITY_CONTAINERS:
+        records = getattr(expander.world, container)
+        dicts = {_id: as_plain_dicts(entity, converted) for _id, entity in records.items()}
+        print_sizes(container, get_deep_size(records), get_deep_size(dicts))
+        all_records.append(records)
+        all_dicts.append(dicts)
+    print_sizes('all entities', get_deep_size(all_records), get_deep_size(all_dicts))
+
+    troops = [troop for troop in expander.troops.values() if troop.name != '`?`']
+    troop_dicts = [as_plain_dicts(troop, converted) for troop in troops]
+    for fields, get_dict_fields, get_record_fields in (
+            ('name, types, roles', lambda t: (t['name'], t['types'], t['roles']), lambda t: (t.name, t.types, t.roles)),
+            ('colors', lambda t: t['colors'], lambda t: t.colors)):
+        timings = (
+            ('dict keys', time_access(troop_dicts, get_dict_fields)),
+            ('record attributes', time_access(troops, get_record_fields)),
+            ('record keys', time_access(troops, get_dict_fields)),
+        )
+        for title, timing in timings:
+            print(f'troop {fields} via {title:<20} {timing / (100 * len(troops)) * 1e9:.0f}ns per troop')
+
+
+BENCHMARKS = {
+    'fuzzy_search': benchmark_fuzzy_search,
+    'spell_templates': benchmark_spell_templates,
+    'world_json_memory': benchmark_world_json_memory,
+    'entity_memory': benchmark_entity_memory,
+    'translations': benchmark_translations,
+    'translation_storage': benchmark_translation_storage,
+    'search_path': benchmark_search_path,
+    'template_rendering': benchmark_template_rendering,
+}
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmarks running against the configured game assets.')
+    parser.add_argument('benchmarks', nargs='*', metavar='benchmark',
+                        help=f'one of {", ".join(BENCHMARKS)}, runs all if omitted')
+    args = parser.parse_args()
+    unknown_benchmarks = set(args.benchmarks) - set(BENCHMARKS)
+    if unknown_benchmarks:
+        parser.error(f'unknown benchmark {", ".join(sorted(unknown_benchmarks))}')
+
+    load_start = time.perf_counter()
+    team_expander = TeamExpander()
+    print(f'Game data loaded in {time.perf_counter() - load_start:.3f}s.')
+    for benchmark in args.benchmarks or BENCHMARKS:
+        BENCHMARKS[benchmark](team_expander)
@@ -8,18 +8,18 @@ from functools import partialmethod
 
 import discord
 import humanize
-import prettytable
 
 import bot_tasks
 import models
 from base_bot import BaseBot, log
-from command_registry import COMMAND_REGISTRY
+from command_registry import COMMAND_REGISTRY, TEAM_CODES
 from configurations import CONFIG
+from data_source.population_pipeline import format_timings
 from discord_helpers import admin_required, guild_required
 from game_constants import CAMPAIGN_COLORS
 from help import get_tower_help_text
 from jobs.news_downloader import NewsDownloader
-from search import TeamExpander, _
+from search import TeamExpander, translations_in_scope
 from tower_data import TowerOfDoomData
 from translations import HumanizeTranslator, LANGUAGES, LANGUAGE_CODE_MAPPING
 from util import bool_to_emoticon, chunks, debug, pluralize_author
@@ -86,8 +86,8 @@ class DiscordBot(BaseBot):
     async def show_campaign_tasks(self, message, lang, tier, **kwargs):
         campaign_data = self.expander.get_campaign_tasks(lang, tier)
         if not campaign_data['has_content']:
-            title = _('[NO_CURRENT_TASK]', lang)
-            description = _('[CAMPAIGN_COMING_SOON]', lang)
+            title = self.expander.translations.get('[NO_CURRENT_TASK]', lang)
+            description = self.expander.translations.get('[CAMPAIGN_COMING_SOON]', lang)
             e = discord.Embed(title=title, description=description, color=self.WHITE)
             return await self.answer(message, e)
 
@@ -161,6 +161,13 @@ class DiscordBot(BaseBot):
         e = discord.Embed(title='Version', description=self.VERSION, color=self.WHITE)
         await self.answer(message, e)
 
+    @guild_required
+    @admin_required
+    async def show_population_timings(self, message, **kwargs):
+        lines = format_timings(self.expander.world.population_timings)
+        e = await self.generate_embed_from_text(lines, 'Game data population', 'Stage timings')
+        await self.answer(message, e)
+
     async def show_events(self, message, lang, **kwargs):
         events = self.expander.get_events(lang)
         e = self.views.render_events(events)
@@ -172,7 +179,8 @@ class DiscordBot(BaseBot):
         await self.answer(message, e)
 
     async def show_help(self, message, prefix, lang, **kwargs):
-        e = self.views.render_help(prefix, lang)
+        with translations_in_scope(self.expander.translations):
+            e = self.views.render_help(prefix, lang)
         await self.answer(message, e)
 
     async def show_tower_help(self, message, prefix, lang, **kwargs):
@@ -267,6 +275,10 @@ class DiscordBot(BaseBot):
                             **kwargs):
         search_function = getattr(self.expander, 'search_{}'.format(title.lower()))
         result = search_function(search_term, lang)
+        close_match = False
+        if not result:
+            result = self.expander.search_fuzzy(title.lower(), search_term, lang)
+            close_match = bool(result)
         if not result:
             e = discord.Embed(title=f'{title} search for `{search_term}` did not yield any result',
                               description=':(',
@@ -274,6 +286,8 @@ class DiscordBot(BaseBot):
         elif len(result) == 1:
             view = getattr(self.views, 'render_{}'.format(title.lower()))
             e = view(result[0], shortened)
+            if close_match:
+                e.title = f'{title} search for `{search_term}` found one close match'
         else:
             e = discord.Embed(title=f'{title} search for `{search_term}` found {len(result)} matches.',
                               color=self.WHITE)
@@ -297,44 +311,13 @@ class DiscordBot(BaseBot):
     handle_traitstone_search = partialmethod(handle_search, title='Traitstone', formatter='{0[name]}')
 
     async def show_class_summary(self, message, lang, **kwargs):
-        result = self.expander.search_class('summary', lang)
-        result.sort(key=operator.itemgetter('name'))
-
-        table = prettytable.PrettyTable()
-        table.field_names = [
-            _('[NAME_A_Z]', lang),
-            _('[FILTER_TROOPTYPE]', lang),
-            _('[FILTER_KINGDOMS]', lang)
-        ]
-        table.align = 'l'
-        table.hrules = prettytable.HEADER
-        table.vrules = prettytable.NONE
-        [table.add_row([_class['name'], _class['type_short'], _class['kingdom']]) for _class in result]
-
-        e = await self.generate_embed_from_text(table.get_string().split('\n'),
-                                                _('[CLASS]', lang),
-                                                _('[OVERVIEW]', lang))
+        summary = self.expander.get_summary('class', lang)
+        e = self.generate_embed_from_fields(summary['title'], summary['fields'])
         await self.answer(message, e)
 
     async def show_kingdom_summary(self, message, lang, **kwargs):
-        result = self.expander.search_kingdom('summary', lang)
-        result.sort(key=operator.itemgetter('name'))
-
-        table = prettytable.PrettyTable()
-        table.field_names = [
-            _('[NAME_A_Z]', lang),
-            _('[TROOPS]', lang),
-            _('[FACTIONS]', lang),
-        ]
-        table.align = 'l'
-        table.hrules = prettytable.HEADER
-        table.vrules = prettytable.NONE
-        [table.add_row([kingdom['name'], len(kingdom['troops']), kingdom['linked_kingdom'] or '-']) for kingdom in
-         result]
-
-        e = await self.generate_embed_from_text(table.get_string().split('\n'),
-                                                _('[KINGDOMS]', lang),
-                                                _('[OVERVIEW]', lang))
+        summary = self.expander.get_summary('kingdom', lang)
+        e = self.generate_embed_from_fields(summary['title'], summary['fields'])
         await self.answer(message, e)
 
     @staticmethod
@@ -344,14 +327,16 @@ class DiscordBot(BaseBot):
         return e
 
     async def handle_team_code(self, message, lang, team_code, shortened='', **kwargs):
-        team = self.expander.get_team_from_message(team_code, lang)
-        if not team or not team['troops']:
+        team_codes = [match['team_code'] for match in TEAM_CODES.finditer(message.content)] or [team_code]
+        teams = [team for team in self.expander.get_teams_from_messages(team_codes, lang) if team['troops']]
+        if not teams:
             log.debug(f'nothing found in message {team_code}.')
             return
         author = message.author.display_name
         author = await pluralize_author(author)
-        e = self.views.render_team(team, author, shortened)
-        await self.answer(message, e)
+        for team in teams:
+            e = self.views.render_team(team, author, shortened)
+            await self.answer(message, e)
 
     async def waffles(self, message, **kwargs):
         waffle_no = random.randint(0, 66)
@@ -568,9 +553,14 @@ class DiscordBot(BaseBot):
 
 if __name__ == '__main__':
     client = DiscordBot()
+    file_watcher = bot_tasks.create_file_watcher(client.expander)
     bot_tasks.task_check_for_news.start(client)
-    bot_tasks.task_check_for_data_updates.start(client)
-    if TOKEN is not None:
-        client.run(TOKEN)
-    else:
-        log.error('FATAL ERROR: DISCORD_TOKEN env var was not specified.')
+    bot_tasks.task_check_for_data_updates.start(client, file_watcher)
+    bot_tasks.task_update_time_dependent_data.start(client)
+    try:
+        if TOKEN is not None:
+            client.run(TOKEN)
+        else:
+            log.error('FATAL ERROR: DISCORD_TOKEN env var was not specified.')
+    finally:
+        file_watcher.close()
@@ -1,15 +1,26 @@
 import asyncio
-import datetime
-import os
+import time
 
 from discord.ext import tasks
 
 from base_bot import log
 from configurations import CONFIG
-from game_assets import GameAssets
+from file_watcher import FileWatcher
 from jobs.news_downloader import NewsDownloader
-from search import TeamExpander, update_translations
-from translations import LANG_FILES
+from search import build_team_expander
+from translations import LANGUAGES
+
+GAME_DATASETS = {
+    'World.json': 'World',
+    'User.json': 'User',
+    'Campaign.json': 'Campaign',
+    'Soulforge.json': 'Soulforge',
+    **{f'GemsOfWar_{language}.json': language for language in LANGUAGES.values()},
+}
+
+
+def create_file_watcher(expander):
+    return FileWatcher(GAME_DATASETS, CONFIG.get('file_update_debounce_seconds'), expander.file_hashes)
 
 
 @tasks.loop(minutes=CONFIG.get('news_check_interval_minutes'), reconnect=False)
@@ -25,31 +36,57 @@ async def task_check_for_news(discord_client):
             log.exception(e)
 
 
+@tasks.loop(minutes=1)
+async def task_update_time_dependent_data(discord_client):
+    try:
+        if discord_client.expander.refresh_time_dependent_data():
+            log.debug('Recomputed events, spoilers and weekly game data for the new day.')
+    except Exception as e:
+        log.error('Could not update time dependent game data. Stacktrace follows.')
+        log.exception(e)
+
+
 @tasks.loop(seconds=CONFIG.get('file_update_check_seconds'))
-async def task_check_for_data_updates(discord_client):
-    filenames = LANG_FILES + ['World.json', 'User.json', 'Campaign.json', 'Soulforge.json']
-    now = datetime.datetime.now()
-    modified_files = []
-    for filename in filenames:
-        file_path = GameAssets.path(filename)
+async def task_check_for_data_updates(discord_client, file_watcher):
+    changed = file_watcher.poll()
+    if changed:
+        modified_files = list(changed)
+        log.debug(f'Game data changed in {", ".join(file_watcher.describe(modified_files))}, '
+                  f'reloading {", ".join(modified_files)}.')
+        try:
+            if await reload_expander(discord_client, modified_files):
+                file_watcher.accept(discord_client.expander.file_hashes)
+                return
+        except Exception as e:
+            log.error('Could not apply game file changes, reloading everything. Stacktrace follows.')
+            log.exception(e)
         try:
-            modification_time = datetime.datetime.fromtimestamp(os.path.getmtime(file_path))
-        except FileNotFoundError:
-            continue
-        modified = now - modification_time <= datetime.timedelta(seconds=CONFIG.get('file_update_check_seconds'))
-        if modified:
-            modified_files.append(filename)
-    if modified_files:
-        log.debug(f'Game file modification detected, reloading {", ".join(modified_files)}.')
-        await asyncio.sleep(5)
-        lock = asyncio.Lock()
-        async with lock:
-            try:
-                old_expander = discord_client.expander
-                del discord_client.expander
-                discord_client.expander = TeamExpander()
-                update_translations()
-            except Exception as e:
-                log.error('Could not update game file. Stacktrace follows.')
-                log.exception(e)
-                discord_client.expander = old_expander
+            await rebuild_expander(discord_client)
+            file_watcher.accept(discord_client.expander.file_hashes)
+        except Exception as e:
+            log.error('Could not update game file. Stacktrace follows.')
+            log.exception(e)
+
+
+async def reload_expander(discord_client, filenames):
+    loop = asyncio.get_event_loop()
+    start = time.perf_counter()
+    new_expander = await loop.run_in_executor(None, discord_client.expander.reload, filenames)
+    if new_expander is None:
+        return False
+    swap_expander(discord_client, new_expander, time.perf_counter() - start)
+    return True
+
+
+async def rebuild_expander(discord_client):
+    loop = asyncio.get_event_loop()
+    new_expander, build_time = await loop.run_in_executor(None, build_team_expander)
+    swap_expander(discord_client, new_expander, build_time)
+
+
+def swap_expander(discord_client, new_expander, build_time):
+    old_expander = discord_client.expander
+    discord_client.expander = new_expander
+    log.info(f'Swapped game data version {old_expander.version} for version {new_expander.version}, '
+             f'built in the background in {build_time:.3f}s.')
+    log.debug(f'Dropped translation cache of old game data: {old_expander.translation_cache.info()}.')
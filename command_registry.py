@@ -6,6 +6,8 @@ LANG_PATTERN = r'(?P<lang>' + '|'.join(LANGUAGES) + ')?'
 DEFAULT_PATTERN = '^' + LANG_PATTERN + '(?P<shortened>-)?(?P<prefix>.)'
 SEARCH_PATTERN = DEFAULT_PATTERN + '{0} #?(?P<search_term>.*)$'
 MATCH_OPTIONS = re.IGNORECASE | re.MULTILINE
+TEAM_CODE_PATTERN = r'\[(?P<team_code>(\d+,?){1,13})]'
+TEAM_CODES = re.compile(TEAM_CODE_PATTERN)
 COMMAND_REGISTRY = [
     {
         'function': 'show_version',
@@ -15,6 +17,10 @@ COMMAND_REGISTRY = [
         'function': 'show_uptime',
         'pattern': re.compile(DEFAULT_PATTERN + 'uptime$', MATCH_OPTIONS)
     },
+    {
+        'function': 'show_population_timings',
+        'pattern': re.compile(DEFAULT_PATTERN + 'timings$', MATCH_OPTIONS)
+    },
     {
         'function': 'handle_troop_search',
         'pattern': re.compile(SEARCH_PATTERN.format('troop'), MATCH_OPTIONS)
@@ -134,7 +140,7 @@ COMMAND_REGISTRY = [
     {
         'function': 'handle_team_code',
         'pattern': re.compile(
-            r'^([^>].*)??' + LANG_PATTERN + r'(?P<shortened>-)?\[(?P<team_code>(\d+,?){1,13})].*',
+            r'^([^>].*)??' + LANG_PATTERN + r'(?P<shortened>-)?' + TEAM_CODE_PATTERN + r'.*',
             MATCH_OPTIONS | re.DOTALL)
     },
     {
@@ -1,3 +1,6 @@
+from data_source.hero_class import HeroClass
+from data_source.kingdom import Kingdom
+from data_source.pet import Pet
 from data_source.spell import Spell
 from data_source.trait import Trait
 from data_source.troop import Troop
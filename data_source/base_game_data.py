@@ -0,0 +1,63 @@
+from game_constants import COLORS
+
+COLOR_BITS = {color: 1 << i for i, color in enumerate(COLORS)}
+COLORS_BY_MASK = tuple(tuple(sorted(color for color, bit in COLOR_BITS.items() if mask & bit))
+                       for mask in range(1 << len(COLORS)))
+
+
+class BaseGameData:
+    __slots__ = ()
+    FIELDS = ()
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls.FIELDS = tuple('colors' if slot == 'color_mask' else slot for slot in cls.__slots__)
+
+    def __init__(self, **fields):
+        for key, value in fields.items():
+            setattr(self, key, value)
+
+    @property
+    def colors(self):
+        return COLORS_BY_MASK[self.color_mask]
+
+    @colors.setter
+    def colors(self, colors):
+        self.color_mask = sum(COLOR_BITS[color] for color in set(colors))
+
+    def __getitem__(self, key):
+        try:
+            return getattr(self, key)
+        except AttributeError:
+            raise KeyError(key) from None
+
+    def __setitem__(self, key, value):
+        setattr(self, key, value)
+
+    def __contains__(self, key):
+        return hasattr(self, key)
+
+    def __repr__(self):
+        return f'{self.__class__.__name__}({self.copy()})'
+
+    def get(self, key, default=None):
+        return getattr(self, key, default)
+
+    def pop(self, key, default=None):
+        value = getattr(self, key, default)
+        if hasattr(self, key):
+            delattr(self, key)
+        return value
+
+    def keys(self):
+        return [key for key in self.FIELDS if hasattr(self, key)]
+
+    def items(self):
+        return [(key, getattr(self, key)) for key in self.keys()]
+
+    def update(self, fields):
+        for key, value in fields.items():
+            setattr(self, key, value)
+
+    def copy(self):
+        return dict(self.items())
@@ -0,0 +1,27 @@
+import bisect
+import datetime
+import operator
+
+
+class DateIndex:
+    def __init__(self, items, start_key, end_key=None):
+        self.items = sorted(items, key=operator.itemgetter(start_key))
+        self.starts = [item[start_key] for item in self.items]
+        self.end_key = end_key
+        self.max_duration = datetime.timedelta(0)
+        if end_key:
+            self.max_duration = max([item[end_key] - item[start_key] for item in self.items],
+                                    default=datetime.timedelta(0))
+
+    def __len__(self):
+        return len(self.items)
+
+    def starting_from(self, first):
+        return self.items[bisect.bisect_left(self.starts, first):]
+
+    def starting_between(self, first, last):
+        return self.items[bisect.bisect_left(self.starts, first):bisect.bisect_right(self.starts, last)]
+
+    def active_on(self, day):
+        candidates = self.starting_between(day - self.max_duration, day)
+        return [item for item in candidates if day <= item[self.end_key]]
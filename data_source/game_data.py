@@ -1,7 +1,20 @@
 import datetime
+import hashlib
+import json
 import operator
+import pickle
 import re
-
+import sys
+
+from data_source.date_index import DateIndex
+from data_source.hero_class import HeroClass
+from data_source.kingdom import Kingdom
+from data_source.pet import Pet
+from data_source.population_pipeline import PopulationPipeline
+from data_source.spell import Spell
+from data_source.trait import Trait
+from data_source.troop import Troop
+from data_source.weapon import Weapon
 from game_assets import GameAssets
 from game_constants import COLORS, EVENT_TYPES
 from util import convert_color_array
@@ -23,9 +36,84 @@ class U(str):
 
 
 class GameData:
+    WORLD_SECTIONS = {
+        'Spells': 'Id',
+        'Traits': 'Code',
+        'Troops': 'Id',
+        'Kingdoms': 'Id',
+        'Weapons': 'Id',
+        'Pets': 'Id',
+        'TalentTrees': 'Code',
+        'HeroClasses': 'Id',
+    }
+    PATCHABLE_SECTIONS = {
+        'Spells': ('spells', 'build_spell', ()),
+        'Traits': ('traits', 'build_trait', ()),
+        'Troops': ('troops', 'build_troop', ('rarity',)),
+        'Weapons': ('weapons', 'build_weapon', ('kingdom', 'requirement', 'rarity', 'colors')),
+        'Pets': ('pets', 'build_pet', ('kingdom',)),
+    }
+    PRESERVED_FIELDS = {
+        'Troops': ('kingdom',),
+    }
+    USER_SECTION_UPDATES = {
+        'TroopReleaseDates': 'release_dates',
+        'KingdomReleaseDates': 'release_dates',
+        'HeroClassReleaseDates': 'release_dates',
+        'PetReleaseDates': 'release_dates',
+        'RoomReleaseDates': 'release_dates',
+        'WeaponReleaseDates': 'release_dates',
+        'BasicLiveEventArray': 'release_dates',
+        'pTasksData': 'campaign_tasks',
+        'pTraitsTable': 'traitstones',
+        'Explore_RunePerKingdom': 'traitstones',
+        'HeroLevelUpStats': 'levels',
+        'KingdomLevelData': None,
+        'FactionRenownRewardPetIds': None,
+    }
+    SECTION_UPDATES = {
+        'Troops': ('release_dates', 'soulforge'),
+        'Campaign': ('campaign_tasks',),
+        'Soulforge': ('soulforge',),
+    }
+    UPDATE_ORDER = ('release_dates', 'traitstones', 'campaign_tasks', 'soulforge', 'levels')
+    POPULATION_STAGES = {
+        'user_data': ('read_user_data', (), ('user_data', 'campaign_data', 'soulforge_raw_data')),
+        'spells': ('populate_spells', ('Spells',), ('spells',)),
+        'traits': ('populate_traits', ('Traits',), ('traits',)),
+        'troops': ('populate_troops', ('Troops', 'traits'), ('troops', 'trait_troop_ids')),
+        'kingdoms': ('populate_kingdoms', ('Kingdoms', 'troops'),
+                     ('kingdoms', 'banners', 'troop_kingdoms', 'kingdom_troop_ids')),
+        'weapons': ('populate_weapons', ('Weapons', 'spells', 'kingdoms'),
+                    ('weapons', 'affix_weapon_ids', 'kingdom_weapon_ids')),
+        'pets': ('populate_pets', ('Pets', 'kingdoms'), ('pets', 'pet_effects', 'kingdom_pet_ids')),
+        'talents': ('populate_talents', ('TalentTrees', 'traits'), ('talent_trees', 'trait_talent_trees')),
+        'classes': ('populate_classes', ('HeroClasses', 'traits', 'talent_trees', 'weapons'),
+                    ('classes', 'trait_class_ids', 'class_ids_by_code', 'weapon_classes', 'talent_tree_classes')),
+        'release_dates': ('populate_release_dates',
+                          ('user_data', 'troops', 'troop_kingdoms', 'pets', 'kingdoms', 'classes', 'weapons',
+                           'kingdom_weapon_ids'),
+                          ('spoilers', 'events', 'spoiler_index', 'event_index', 'soulforge_weapons', 'release_dates')),
+        'enrich_kingdoms': ('enrich_kingdoms',
+                            ('user_data', 'kingdoms', 'kingdom_troop_ids', 'pets', 'weapons', 'kingdom_weapon_ids'),
+                            ('kingdom_details',)),
+        'campaign_tasks': ('populate_campaign_tasks', ('user_data', 'campaign_data', 'event_index'),
+                           ('campaign_tasks', 'campaign_task_index', 'kingdom_campaign_tasks', 'event_kingdom_id')),
+        'current_week': ('refresh_current_week', ('soulforge_weapons', 'campaign_tasks', 'event_kingdom_id'),
+                         ('current_soulforge_weapon_ids',)),
+        'soulforge': ('populate_soulforge', ('soulforge_raw_data', 'troops'), ('soulforge',)),
+        'traitstones': ('populate_traitstones', ('user_data', 'troops', 'classes', 'class_ids_by_code'),
+                        ('traitstones',)),
+        'levels': ('populate_levels', ('user_data',), ('levels',)),
+    }
+    POPULATION_PIPELINE = PopulationPipeline(POPULATION_STAGES)
+    CAMPAIGN_TASK_ID = re.compile(r'Campaign_(?P<kingdom_id>\d+)_(?P<level>.+)_(?P<order>\d+)')
+    NO_TRAIT = Trait(code='', name='[TRAIT_NONE]', description='[TRAIT_NONE_DESC]')
 
     def __init__(self):
         self.data = None
+        self.section_hashes = {}
+        self.file_hashes = {}
         self.user_data = {
             'pEconomyModel': {
                 'TroopReleaseDates': [],
@@ -38,81 +126,235 @@ class GameData:
             }
         }
 
-        self.troops = {'`?`': {'name': '`?`'}}
+        self.troops = {'`?`': Troop(name='`?`')}
         self.spells = {}
         self.weapons = {}
+        self.affix_weapon_ids = {}
+        self.kingdom_weapon_ids = {}
         self.classes = {}
+        self.class_ids_by_code = {}
         self.banners = {}
         self.traits = {}
+        self.trait_troop_ids = {}
+        self.trait_class_ids = {}
+        self.trait_talent_trees = {}
         self.kingdoms = {}
+        self.kingdom_troop_ids = {}
         self.pet_effects = ()
         self.pets = {}
+        self.kingdom_pet_ids = {}
         self.talent_trees = {}
         self.spoilers = []
         self.events = []
+        self.spoiler_index = DateIndex(self.spoilers, 'date')
+        self.event_index = DateIndex(self.events, 'start', 'end')
         self.soulforge_weapons = []
+        self.current_soulforge_weapon_ids = []
+        self.event_kingdom_id = None
         self.campaign_tasks = {}
+        self.campaign_task_index = {}
+        self.kingdom_campaign_tasks = {}
         self.campaign_data = {}
         self.soulforge = {}
         self.soulforge_raw_data = {}
         self.traitstones = {}
         self.levels = []
+        self.population_timings = []
+
+    def copy(self):
+        world = GameData()
+        world.__dict__.update(pickle.loads(pickle.dumps(self.__dict__, protocol=pickle.HIGHEST_PROTOCOL)))
+        return world
 
-    def read_json_data(self):
-        self.data = GameAssets.load('World.json')
+    def read_json_data(self, previous=None):
+        if previous:
+            for section in self.WORLD_SECTIONS:
+                self.section_hashes[section] = previous.section_hashes[section]
+        else:
+            self.hash_file('World.json')
+            self.data = GameAssets.load('World.json')
+            for section in self.WORLD_SECTIONS:
+                for _ in self.hash_entries(section, self.data[section]):
+                    pass
+        self.read_user_data()
+
+    def read_user_data(self):
+        for filename in ('User.json', 'Campaign.json', 'Soulforge.json'):
+            self.hash_file(filename)
         self.user_data = GameAssets.load('User.json')
         if GameAssets.exists('Campaign.json'):
             self.campaign_data = GameAssets.load('Campaign.json')
         if GameAssets.exists('Soulforge.json'):
             self.soulforge_raw_data = GameAssets.load('Soulforge.json')
+        user_sections = dict(self.user_data)
+        user_sections.update(user_sections.pop('pEconomyModel', {}))
+        self.section_hashes['User'] = {key: self.hash_entry(value) for key, value in user_sections.items()}
+        self.section_hashes['Campaign'] = {key: self.hash_entry(value) for key, value in self.campaign_data.items()}
+        self.section_hashes['Soulforge'] = {key: self.hash_entry(value)
+                                            for key, value in self.soulforge_raw_data.items()}
+
+    def hash_file(self, filename):
+        self.file_hashes[filename] = GameAssets.hash(filename) if GameAssets.exists(filename) else None
+
+    def hash_entries(self, section, entries):
+        key = self.WORLD_SECTIONS[section]
+        hashes = self.section_hashes.setdefault(section, {})
+        for entry in entries:
+            hashes[entry[key]] = self.hash_entry(entry)
+            yield entry
 
-    def populate_world_data(self):
-        self.read_json_data()
-
-        self.populate_spells()
-        self.populate_traits()
-        self.populate_troops()
-        self.populate_kingdoms()
-        self.populate_weapons()
-        self.populate_pets()
-        self.populate_talents()
-        self.populate_classes()
+    @staticmethod
+    def hash_entry(entry):
+        return hashlib.sha1(json.dumps(entry, sort_keys=True).encode('utf-8')).digest()
+
+    def get_changes(self, new_data):
+        changes = {}
+        for section, new_hashes in new_data.section_hashes.items():
+            old_hashes = self.section_hashes.get(section, {})
+            changed = {key for key in old_hashes.keys() & new_hashes.keys() if old_hashes[key] != new_hashes[key]}
+            added = new_hashes.keys() - old_hashes.keys()
+            removed = old_hashes.keys() - new_hashes.keys()
+            if changed or added or removed:
+                changes[section] = {'changed': changed, 'added': added, 'removed': removed}
+        return changes
+
+    def apply_changes(self, new_data):
+        if not self.section_hashes:
+            return None
+        changes = self.get_changes(new_data)
+        updates = set()
+        patches = {}
+        for section, keys in changes.items():
+            if section in self.WORLD_SECTIONS:
+                if section not in self.PATCHABLE_SECTIONS or keys['added'] or keys['removed']:
+                    return None
+                patches[section] = keys['changed']
+            elif section == 'User':
+                for key in keys['changed'] | keys['added'] | keys['removed']:
+                    if key not in self.USER_SECTION_UPDATES:
+                        continue
+                    if not self.USER_SECTION_UPDATES[key]:
+                        return None
+                    updates.add(self.USER_SECTION_UPDATES[key])
+            updates.update(self.SECTION_UPDATES.get(section, ()))
+
+        built_entities = {}
+        for section, ids in patches.items():
+            attribute, builder, link_fields = self.PATCHABLE_SECTIONS[section]
+            key = self.WORLD_SECTIONS[section]
+            entities = getattr(self, attribute)
+            raw_entities = [entry for entry in new_data.data[section] if entry[key] in ids]
+            built_entities[section] = {entry[key]: getattr(self, builder)(entry) for entry in raw_entities}
+            for _id, entity in built_entities[section].items():
+                if any(entities[_id][field] != entity[field] for field in link_fields):
+                    return None
+
+        self.user_data = new_data.user_data
+        self.campaign_data = new_data.campaign_data
+        self.soulforge_raw_data = new_data.soulforge_raw_data
+        for section, entities in built_entities.items():
+            self.patch_entities(section, entities)
+        for update in self.UPDATE_ORDER:
+            if update in updates:
+                getattr(self, f'repopulate_{update}')()
+        self.section_hashes = new_data.section_hashes
+        self.file_hashes.update(new_data.file_hashes)
+        return changes
+
+    def patch_entities(self, section, entities):
+        attribute = self.PATCHABLE_SECTIONS[section][0]
+        preserved_fields = self.PRESERVED_FIELDS.get(section, ())
+        all_entities = getattr(self, attribute)
+        for _id, entity in entities.items():
+            old_entity = all_entities[_id]
+            if section == 'Troops':
+                self.patch_users(self.trait_troop_ids, all_entities, _id,
+                                 [trait['code'] for trait in old_entity['traits']],
+                                 list(dict.fromkeys(trait['code'] for trait in entity['traits'])))
+            elif section == 'Weapons':
+                self.patch_users(self.affix_weapon_ids, all_entities, _id,
+                                 [affix['id'] for affix in old_entity['affixes']],
+                                 [affix['id'] for affix in entity['affixes']])
+            old_entity.update({k: v for k, v in entity.items() if k not in preserved_fields})
+
+    @staticmethod
+    def patch_users(users, entities, user_id, old_keys, new_keys):
+        positions = {_id: i for i, _id in enumerate(entities)}
+        for key in set(old_keys):
+            users[key] = [_id for _id in users[key] if _id != user_id]
+        for key in new_keys:
+            users.setdefault(key, []).append(user_id)
+            users[key].sort(key=positions.get)
+
+    def repopulate_release_dates(self):
+        for entities in (self.troops, self.pets, self.kingdoms, self.classes, self.weapons):
+            for entity in entities.values():
+                entity.pop('release_date', None)
+        for troop in self.troops.values():
+            troop.pop('event', None)
         self.populate_release_dates()
-        self.enrich_kingdoms()
+        self.refresh_current_week()
+
+    def repopulate_traitstones(self):
+        for entities in (self.troops, self.classes):
+            for entity in entities.values():
+                entity.pop('traitstones', None)
+        self.traitstones = {}
+        self.populate_traitstones()
+
+    def repopulate_campaign_tasks(self):
         self.populate_campaign_tasks()
+
+    def repopulate_soulforge(self):
+        self.soulforge = {}
         self.populate_soulforge()
-        self.populate_traitstones()
+
+    def repopulate_levels(self):
+        self.levels = []
         self.populate_levels()
 
-    def populate_classes(self):
-        for _class in self.data['HeroClasses']:
-            self.classes[_class['Id']] = {
-                'id': _class['Id'],
-                'name': _class['Name'],
-                'code': _class['Code'],
-                'talents': [self.talent_trees[tree]['talents'] for tree in _class['TalentTrees']],
-                'trees': _class['TalentTrees'],
-                'traits': [self.traits.get(trait, {'name': trait, 'description': '-'}) for trait in _class['Traits']],
-                'weapon_id': _class['ClassWeaponId'],
-                'kingdom_id': _class['KingdomId'],
-                'type': _class['Augment'][0],
-                'magic_color': _class['BonusColor'],
-                'weapon_color': _class['BonusWeapon'],
-            }
+    def populate_world_data(self, sections=None, workers=1):
+        if sections is None:
+            self.hash_file('World.json')
+            sections = GameAssets.stream_sections('World.json')
+        world_sections = ((section, self.hash_entries(section, entries)) for section, entries in sections
+                          if section in self.WORLD_SECTIONS)
+        self.population_timings = self.POPULATION_PIPELINE.run(self, world_sections, workers)
+
+    def populate_classes(self, classes):
+        for _class in classes:
+            self.classes[_class['Id']] = HeroClass(
+                id=_class['Id'],
+                name=_class['Name'],
+                code=_class['Code'],
+                talents=[self.talent_trees[tree]['talents'] for tree in _class['TalentTrees']],
+                trees=_class['TalentTrees'],
+                traits=[self.traits.get(trait, {'name': trait, 'description': '-'}) for trait in _class['Traits']],
+                weapon_id=_class['ClassWeaponId'],
+                kingdom_id=_class['KingdomId'],
+                type=sys.intern(_class['Augment'][0]),
+                magic_color=_class['BonusColor'],
+                weapon_color=_class['BonusWeapon'],
+            )
+            self.class_ids_by_code[_class['Code']] = _class['Id']
             self.weapons[_class['ClassWeaponId']]['class'] = _class['Name']
+            for trait in _class['Traits']:
+                self.add_trait_user(self.trait_class_ids, trait, _class['Id'])
             for tree in _class['TalentTrees']:
                 self.talent_trees[tree]['classes'].append(self.classes[_class['Id']].copy())
 
-    def populate_talents(self):
-        for tree in self.data['TalentTrees']:
+    def populate_talents(self, talent_trees):
+        for tree in talent_trees:
             talents = [self.traits.get(trait, trait) for trait in tree['Traits']]
+            for trait in tree['Traits']:
+                self.add_trait_user(self.trait_talent_trees, trait, tree['Code'])
             self.talent_trees[tree['Code']] = {
                 'name': f'[TALENT_TREE_{tree["Code"].upper()}]',
                 'talents': talents,
                 'classes': [],
             }
 
-    def populate_pets(self):
+    def populate_pets(self, pets):
         self.pet_effects = (
             '[PETTYPE_BUFFTEAMCOLOR]',
             '[PETTYPE_BUFFGEMMASTERY]',
@@ -123,42 +365,53 @@ class GameData:
             '[PETTYPE_LOOTXP]',
             '[PETTYPE_NOEFFECT]',
         )
-        for pet in self.data['Pets']:
-            colors = convert_color_array(pet)
-            self.pets[pet['Id']] = {
-                'id': pet['Id'],
-                'name': pet['Name'],
-                'kingdom': self.kingdoms[pet['KingdomId']],
-                'colors': sorted(colors),
-                'effect': self.pet_effects[pet['Effect']],
-                'effect_data': pet.get('EffectData'),
-                'troop_type': pet.get('EffectTroopType'),
-                'filename': pet['FileBase'],
-            }
+        for pet in pets:
+            self.pets[pet['Id']] = self.build_pet(pet)
+            self.kingdom_pet_ids.setdefault(pet['KingdomId'], []).append(pet['Id'])
+
+    def build_pet(self, pet):
+        colors = convert_color_array(pet)
+        troop_type = pet.get('EffectTroopType')
+        return Pet(
+            id=pet['Id'],
+            name=pet['Name'],
+            kingdom=self.kingdoms[pet['KingdomId']],
+            colors=colors,
+            effect=self.pet_effects[pet['Effect']],
+            effect_data=pet.get('EffectData'),
+            troop_type=sys.intern(troop_type) if troop_type else troop_type,
+            filename=pet['FileBase'],
+        )
 
-    def populate_weapons(self):
-        for weapon in self.data['Weapons']:
-            colors = convert_color_array(weapon)
-            self.weapons[weapon['Id']] = {
-                'id': weapon['Id'],
-                'name': f'[SPELL{weapon["SpellId"]}_NAME]',
-                'description': f'[SPELL{weapon["SpellId"]}_DESC]',
-                'colors': sorted(colors),
-                'rarity': weapon['WeaponRarity'],
-                'type': weapon['Type'],
-                'roles': weapon['TroopRoleArray'],
-                'spell_id': weapon['SpellId'],
-                'kingdom': self.kingdoms[weapon['KingdomId']],
-                'requirement': weapon['MasteryRequirement'],
-                'armor_increase': weapon['ArmorIncrease'],
-                'attack_increase': weapon['AttackIncrease'],
-                'health_increase': weapon['HealthIncrease'],
-                'magic_increase': weapon['SpellPowerIncrease'],
-                'affixes': [self.spells.get(spell) for spell in weapon['Affixes'] if spell in self.spells],
-            }
+    def populate_weapons(self, weapons):
+        for weapon in weapons:
+            self.weapons[weapon['Id']] = self.build_weapon(weapon)
+            for affix in self.weapons[weapon['Id']]['affixes']:
+                self.affix_weapon_ids.setdefault(affix['id'], []).append(weapon['Id'])
+            self.kingdom_weapon_ids.setdefault(weapon['KingdomId'], []).append(weapon['Id'])
+
+    def build_weapon(self, weapon):
+        colors = convert_color_array(weapon)
+        return Weapon(
+            id=weapon['Id'],
+            name=f'[SPELL{weapon["SpellId"]}_NAME]',
+            description=f'[SPELL{weapon["SpellId"]}_DESC]',
+            colors=colors,
+            rarity=sys.intern(weapon['WeaponRarity']),
+            type=sys.intern(weapon['Type']),
+            roles=tuple(sys.intern(role) for role in weapon['TroopRoleArray']),
+            spell_id=weapon['SpellId'],
+            kingdom=self.kingdoms[weapon['KingdomId']],
+            requirement=weapon['MasteryRequirement'],
+            armor_increase=weapon['ArmorIncrease'],
+            attack_increase=weapon['AttackIncrease'],
+            health_increase=weapon['HealthIncrease'],
+            magic_increase=weapon['SpellPowerIncrease'],
+            affixes=[self.spells.get(spell) for spell in weapon['Affixes'] if spell in self.spells],
+        )
 
-    def populate_kingdoms(self):
-        for kingdom in self.data['Kingdoms']:
+    def populate_kingdoms(self, kingdoms):
+        for kingdom in kingdoms:
             colors = [f'[GEM_{c.upper()}]' for c in COLORS]
             colors = zip(colors, kingdom['BannerColors'])
             colors = sorted(colors, key=operator.itemgetter(1), reverse=True)
@@ -169,81 +422,99 @@ class GameData:
             }
             kingdom_troops = [troop_id for troop_id in kingdom['TroopIds'] if troop_id != -1]
             kingdom_colors = convert_color_array(kingdom)
-            self.kingdoms[kingdom['Id']] = {
-                'id': kingdom['Id'],
-                'name': kingdom['Name'],
-                'description': kingdom['Description'],
-                'punchline': kingdom['ByLine'],
-                'underworld': bool(kingdom.get('MapIndex', 0)),
-                'troop_ids': kingdom_troops,
-                'troop_type': kingdom['KingdomTroopType'],
-                'linked_kingdom_id': kingdom.get('SisterKingdomId'),
-                'colors': sorted(kingdom_colors),
-                'filename': kingdom['FileBase'],
-            }
+            self.kingdoms[kingdom['Id']] = Kingdom(
+                id=kingdom['Id'],
+                name=kingdom['Name'],
+                description=kingdom['Description'],
+                punchline=kingdom['ByLine'],
+                underworld=bool(kingdom.get('MapIndex', 0)),
+                troop_ids=kingdom_troops,
+                troop_type=sys.intern(kingdom['KingdomTroopType']),
+                linked_kingdom_id=kingdom.get('SisterKingdomId'),
+                colors=kingdom_colors,
+                filename=kingdom['FileBase'],
+            )
+            self.kingdom_troop_ids[kingdom['Id']] = kingdom_troops
             if 'SisterKingdomId' in kingdom:
-                self.kingdoms[kingdom['SisterKingdomId']]['linked_kingdom_id'] = kingdom['Id']
+                self.kingdoms[kingdom['SisterKingdomId']].linked_kingdom_id = kingdom['Id']
             for troop_id in kingdom_troops:
-                self.troops[troop_id]['kingdom'] = kingdom
-
-    def populate_troops(self):
-        for troop in self.data['Troops']:
-            colors = convert_color_array(troop)
-            no_trait = {'code': '', 'name': '[TRAIT_NONE]', 'description': '[TRAIT_NONE_DESC]'}
-            self.troops[troop['Id']] = {
-                'id': troop['Id'],
-                'name': troop['Name'],
-                'colors': sorted(colors),
-                'description': troop['Description'],
-                'spell_id': troop['SpellId'],
-                'traits': [self.traits.get(trait, no_trait) for trait in
-                           troop['Traits']],
-                'rarity': troop['TroopRarity'],
-                'types': [troop['TroopType']],
-                'roles': troop['TroopRoleArray'],
-                'kingdom': {'Name': ''},
-                'filename': troop["FileBase"],
-            }
-            if 'TroopType2' in troop:
-                self.troops[troop['Id']]['types'].append(troop['TroopType2'])
-
-    def populate_traits(self):
-        for trait in self.data['Traits']:
-            self.traits[trait['Code']] = {
-                'code': trait['Code'],
-                'name': trait['Name'],
-                'description': trait['Description'],
-                'image': trait['Image'],
-            }
+                self.troops[troop_id].kingdom = self.kingdoms[kingdom['Id']]
+
+    def populate_troops(self, troops):
+        for troop in troops:
+            self.troops[troop['Id']] = self.build_troop(troop)
+            for trait in self.troops[troop['Id']]['traits']:
+                self.add_trait_user(self.trait_troop_ids, trait['code'], troop['Id'])
+
+    def build_troop(self, troop):
+        colors = convert_color_array(troop)
+        types = [troop['TroopType']]
+        if 'TroopType2' in troop:
+            types.append(troop['TroopType2'])
+        return Troop(
+            id=troop['Id'],
+            name=troop['Name'],
+            colors=colors,
+            description=troop['Description'],
+            spell_id=troop['SpellId'],
+            traits=[self.traits.get(trait, self.NO_TRAIT) for trait in troop['Traits']],
+            rarity=sys.intern(troop['TroopRarity']),
+            types=tuple(sys.intern(_type) for _type in types),
+            roles=tuple(sys.intern(role) for role in troop['TroopRoleArray']),
+            kingdom=None,
+            filename=troop["FileBase"],
+        )
 
-    def populate_spells(self):
-        for spell in self.data['Spells']:
-            spell_effects = []
-            boost = 0
-            last_type = ""
-            for step in spell['SpellSteps']:
-                if 'Type' in step and 'SpellPowerMultiplier' in step:
-                    amount = step.get('Amount', 0)
-                    multiplier = step.get('SpellPowerMultiplier', 1)
-                    if last_type != step['Type']:
-                        spell_effects.append([multiplier, amount])
-                        last_type = step['Type']
-                elif step['Type'].startswith('Count'):
-                    boost = step.get('Amount', 1)
-            self.spells[spell['Id']] = {
-                'id': spell['Id'],
-                'name': spell['Name'],
-                'description': spell['Description'],
-                'cost': spell['Cost'],
-                'effects': spell_effects,
-                'boost': boost,
-            }
+    @staticmethod
+    def add_trait_user(trait_users, trait_code, user_id):
+        users = trait_users.setdefault(trait_code, [])
+        if user_id not in users:
+            users.append(user_id)
+
+    def populate_traits(self, traits):
+        for trait in traits:
+            self.traits[trait['Code']] = self.build_trait(trait)
+
+    @staticmethod
+    def build_trait(trait):
+        return Trait(
+            code=trait['Code'],
+            name=trait['Name'],
+            description=trait['Description'],
+            image=trait['Image'],
+        )
+
+    def populate_spells(self, spells):
+        for spell in spells:
+            self.spells[spell['Id']] = self.build_spell(spell)
+
+    @staticmethod
+    def build_spell(spell):
+        spell_effects = []
+        boost = 0
+        last_type = ""
+        for step in spell['SpellSteps']:
+            if 'Type' in step and 'SpellPowerMultiplier' in step:
+                amount = step.get('Amount', 0)
+                multiplier = step.get('SpellPowerMultiplier', 1)
+                if last_type != step['Type']:
+                    spell_effects.append([multiplier, amount])
+                    last_type = step['Type']
+            elif step['Type'].startswith('Count'):
+                boost = step.get('Amount', 1)
+        return Spell(
+            id=spell['Id'],
+            name=spell['Name'],
+            description=spell['Description'],
+            cost=spell['Cost'],
+            effects=spell_effects,
+            boost=boost,
+        )
 
-    def get_current_event_kingdom_id(self):
-        today = datetime.date.today()
-        weekly_events = [e for e in self.events
+    def get_current_event_kingdom_id(self, today=None):
+        today = today or datetime.date.today()
+        weekly_events = [e for e in self.event_index.active_on(today)
                          if e['end'] - e['start'] == datetime.timedelta(days=7)
-                         and e['start'] <= today <= e['end']
                          and e['start'].weekday() == 0
                          and e['kingdom_id']]
         if not weekly_events:
@@ -251,26 +522,39 @@ class GameData:
         event_kingdom_id = weekly_events[0]['kingdom_id']
         return int(event_kingdom_id)
 
+    def refresh_current_week(self, today=None):
+        today = today or datetime.date.today()
+        self.current_soulforge_weapon_ids = [weapon_id for weapons in self.soulforge_weapons
+                                             if weapons['start'] <= today < weapons['end']
+                                             for weapon_id in weapons['weapon_ids']]
+        if self.get_current_event_kingdom_id(today) == self.event_kingdom_id:
+            return False
+        self.select_campaign_tasks(today)
+        return True
+
     def populate_campaign_tasks(self):
-        event_kingdom_id = self.get_current_event_kingdom_id()
+        self.campaign_task_index = {
+            level: {t['Id']: (i, t) for i, t in enumerate(tasks) if t}
+            for level, tasks in self.campaign_data.items()
+        }
+        self.kingdom_campaign_tasks = self.user_data['pTasksData']['CampaignTasks']
+        self.select_campaign_tasks()
 
-        tasks = self.user_data['pTasksData']['CampaignTasks'][str(event_kingdom_id)]
+    def select_campaign_tasks(self, today=None):
+        self.event_kingdom_id = self.get_current_event_kingdom_id(today)
+        self.campaign_tasks = {}
+        tasks = self.kingdom_campaign_tasks[str(self.event_kingdom_id)]
         for level in ('Bronze', 'Silver', 'Gold'):
             task_list = [self.transform_campaign_task(task) for task in tasks[level]]
             self.campaign_tasks[level.lower()] = sorted(task_list, key=operator.itemgetter('order'))
 
     def transform_campaign_task(self, task):
-        extra_data = {}
-        m = re.match(r'Campaign_(?P<kingdom_id>\d+)_(?P<level>.+)_(?P<order>\d+)', task['Id'])
+        m = self.CAMPAIGN_TASK_ID.match(task['Id'])
         task_id = m.groupdict()
-        task_order = 1000 + int(task_id['order'])
         kingdom_id = int(task_id['kingdom_id'])
         level = task_id['level']
-
-        for i, t in enumerate(self.campaign_data.get(f'Campaign{level}', [])):
-            if t and t['Id'] == task['Id']:
-                extra_data = t
-                task_order = i
+        task_order, extra_data = self.campaign_task_index.get(f'Campaign{level}', {}).get(
+            task['Id'], (1000 + int(task_id['order']), {}))
 
         translated_task = {
             'reward': task['Rewards'][0]['Amount'],
@@ -298,6 +582,9 @@ class GameData:
         return datetime.datetime.strptime(val, date_format)
 
     def populate_release_dates(self):
+        self.spoilers = []
+        self.events = []
+        self.soulforge_weapons = []
         release: dict
         for release in self.user_data['pEconomyModel']['TroopReleaseDates']:
             troop_id = release['TroopId']
@@ -305,14 +592,14 @@ class GameData:
             if troop_id in self.troops:
                 self.troops[troop_id]['release_date'] = release_date
                 self.spoilers.append({'type': 'troop', 'date': release_date, 'id': troop_id})
-                if self.troops[troop_id]['rarity'] == 'Mythic' and 'Id' in self.troops[troop_id]['kingdom']:
+                if self.troops[troop_id]['rarity'] == 'Mythic' and self.troops[troop_id]['kingdom']:
                     self.events.append(
                         {'start': release_date.date(),
                          'end': release_date.date() + datetime.timedelta(days=7),
                          'type': '[RARITY_5]',
                          'names': self.troops[troop_id]['name'],
                          'gacha': troop_id,
-                         'kingdom_id': self.troops[troop_id]['kingdom']['Id']}
+                         'kingdom_id': self.troops[troop_id]['kingdom']['id']}
                     )
         for release in self.user_data['pEconomyModel']['PetReleaseDates']:
             pet_id = release['PetId']
@@ -359,17 +646,16 @@ class GameData:
         week_long_events = [e for e in self.events
                             if e['end'] - e['start'] == datetime.timedelta(days=7)
                             and e['kingdom_id']]
-        non_craftable_wepon_ids = [
+        non_craftable_wepon_ids = {
             1102, 1114, 1070, 1073, 1119, 1118, 1108, 1109, 1203, 1092, 1067, 1094, 1179, 1178, 1069, 1127, 1096, 1134,
             1097, 1103, 1115, 1123, 1120, 1071, 1095, 1072, 1107, 1100, 1106, 1213, 1121, 1093, 1122, 1295, 1250, 1317,
             1294, 1239, 1223, 1222, 1272, 1252, 1287, 1275, 1251, 1238, 1224, 1296, 1273, 1274, 1286, 1225
-        ]
+        }
         for event in week_long_events:
-            # print([w['kingdom']['id'] for w in self.weapons.values()])
-            kingdom_weapons = [w['id'] for w in self.weapons.values()
-                               if 'kingdom' in w and w['kingdom']['id'] == event['kingdom_id']
-                               and w['id'] not in non_craftable_wepon_ids
-                               and w.get('release_date', datetime.datetime.min).date() < event['end']]
+            kingdom_weapons = [weapon_id for weapon_id in self.kingdom_weapon_ids.get(event['kingdom_id'], [])
+                               if weapon_id not in non_craftable_wepon_ids
+                               and self.weapons[weapon_id].get('release_date', datetime.datetime.min).date()
+                               < event['end']]
             self.soulforge_weapons.append({
                 'start': event['start'],
                 'end': event['end'],
@@ -378,6 +664,8 @@ class GameData:
 
         self.events.sort(key=operator.itemgetter('start'))
         self.spoilers.sort(key=operator.itemgetter('date'))
+        self.spoiler_index = DateIndex(self.spoilers, 'date')
+        self.event_index = DateIndex(self.events, 'start', 'end')
 
     def enrich_kingdoms(self):
         for kingdom_id, kingdom_data in self.user_data['pEconomyModel']['KingdomLevelData'].items():
@@ -388,12 +676,12 @@ class GameData:
             self.kingdoms[int(kingdom_id)]['pet'] = self.pets[pet_id]
 
         factions = [(k_id, kingdom) for k_id, kingdom in self.kingdoms.items() if
-                    kingdom['underworld'] and kingdom['troop_ids']]
+                    kingdom['underworld'] and self.kingdom_troop_ids[k_id]]
         for faction_id, faction_data in factions:
             kingdom_id = faction_data['linked_kingdom_id']
-            faction_weapons = [w['id'] for w in self.weapons.values()
-                               if w['kingdom']['id'] == kingdom_id
-                               and w['requirement'] == 1000
+            kingdom_weapons = [self.weapons[weapon_id] for weapon_id in self.kingdom_weapon_ids.get(kingdom_id, [])]
+            faction_weapons = [w['id'] for w in kingdom_weapons
+                               if w['requirement'] == 1000
                                and sorted(w['colors']) == sorted(faction_data['colors'])
                                and w['rarity'] == 'Epic'
                                ]
@@ -445,8 +733,7 @@ class GameData:
                         'total_amount': rune['amount'],
                     }
                 if 'ClassCode' in traits:
-                    class_id = [_class for _class in self.classes.values()
-                                if _class['code'] == traits['ClassCode']][0]['id']
+                    class_id = self.class_ids_by_code[traits['ClassCode']]
                     self.classes[class_id]['traitstones'] = runes
                     self.traitstones[rune['name']]['class_ids'].append(class_id)
                 elif traits['Troop'] in self.troops:
@@ -0,0 +1,127 @@
+import argparse
+import hashlib
+import logging
+import os
+import pickle
+import threading
+import time
+
+import game_constants
+import util
+from configurations import CONFIG
+from data_source.game_data import GameData
+from data_source.population_pipeline import format_timings
+from game_assets import GameAssets
+
+LOGLEVEL = logging.DEBUG
+
+formatter = logging.Formatter('%(asctime)-15s [%(levelname)s] %(message)s')
+handler = logging.StreamHandler()
+handler.setFormatter(formatter)
+handler.setLevel(LOGLEVEL)
+log = logging.getLogger(__name__)
+
+log.setLevel(LOGLEVEL)
+log.addHandler(handler)
+
+INPUT_FILES = ('World.json', 'User.json', 'Campaign.json', 'Soulforge.json')
+RAW_DATA_ATTRIBUTES = ('data', 'user_data', 'campaign_data', 'soulforge_raw_data')
+
+
+def get_snapshot_version():
+    folder = os.path.dirname(os.path.abspath(__file__))
+    source_files = [os.path.join(folder, filename) for filename in sorted(os.listdir(folder))
+                    if filename.endswith('.py')]
+    source_files += [game_constants.__file__, util.__file__]
+    source_hash = hashlib.sha1()
+    for source_file in source_files:
+        with open(source_file, 'rb') as f:
+            source_hash.update(f.read())
+    return source_hash.hexdigest()
+
+
+SNAPSHOT_VERSION = get_snapshot_version()
+
+
+def hash_input_files():
+    return {filename: GameAssets.hash(filename) if GameAssets.exists(filename) else None
+            for filename in INPUT_FILES}
+
+
+def read_snapshot(path, hashes):
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, 'rb') as f:
+            snapshot = pickle.load(f)
+    except Exception as e:
+        log.warning(f'Could not read game data snapshot {path}: {e}.')
+        return None
+    if snapshot.get('version') != SNAPSHOT_VERSION or snapshot.get('hashes') != hashes:
+        return None
+
+    world = GameData()
+    world.__dict__.update(snapshot['world'])
+    world.refresh_current_week()
+    return world
+
+
+def write_snapshot(path, hashes, world):
+    snapshot = {
+        'version': SNAPSHOT_VERSION,
+        'hashes': hashes,
+        'world': {k: v for k, v in world.__dict__.items() if k not in RAW_DATA_ATTRIBUTES},
+    }
+    temp_path = f'{path}.tmp'
+    with open(temp_path, 'wb') as f:
+        pickle.dump(snapshot, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(temp_path, path)
+
+
+def build_game_data():
+    world = GameData()
+    world.populate_world_data(workers=CONFIG.get('game_data_workers') or 1)
+    log.debug('Game data population timings:\n' + '\n'.join(format_timings(world.population_timings)))
+    return world
+
+
+def load_game_data():
+    path = CONFIG.get('game_data_snapshot')
+    if not path:
+        return build_game_data()
+
+    start = time.perf_counter()
+    hashes = hash_input_files()
+    world = read_snapshot(path, hashes)
+    if world:
+        world.population_timings = [{
+            'stage': 'snapshot',
+            'seconds': time.perf_counter() - start,
+            'count': len(world.troops),
+            'thread': threading.current_thread().name,
+        }]
+        log.debug(f'Loaded game data from snapshot {path}.')
+        return world
+
+    world = build_game_data()
+    try:
+        write_snapshot(path, hashes, world)
+        log.debug(f'Wrote game data snapshot {path}.')
+    except OSError as e:
+        log.warning(f'Could not write game data snapshot {path}: {e}.')
+    return world
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Prebuilds the game data snapshot from the configured game assets.')
+    parser.add_argument('--path', default=CONFIG.get('game_data_snapshot'),
+                        help='snapshot file to write, defaults to the configured game_data_snapshot')
+    args = parser.parse_args()
+    if not args.path:
+        parser.error('no snapshot path given and game_data_snapshot is not configured')
+
+    start = time.perf_counter()
+    input_hashes = hash_input_files()
+    game_data = build_game_data()
+    write_snapshot(args.path, input_hashes, game_data)
+    print(f'Snapshot {args.path} built in {time.perf_counter() - start:.3f}s.')
@@ -1,2 +1,6 @@
-class HeroClass:
-    pass
+from data_source.base_game_data import BaseGameData
+
+
+class HeroClass(BaseGameData):
+    __slots__ = ('id', 'name', 'code', 'talents', 'trees', 'traits', 'weapon_id', 'kingdom_id', 'type', 'magic_color',
+                 'weapon_color', 'release_date', 'traitstones')
@@ -1,2 +1,7 @@
-class Kingdom:
-    pass
+from data_source.base_game_data import BaseGameData
+
+
+class Kingdom(BaseGameData):
+    __slots__ = ('id', 'name', 'description', 'punchline', 'underworld', 'troop_ids', 'troop_type',
+                 'linked_kingdom_id', 'color_mask', 'filename', 'release_date', 'primary_color', 'primary_stat', 'pet',
+                 'event_weapon')
@@ -1,2 +1,6 @@
-class Pet:
-    pass
+from data_source.base_game_data import BaseGameData
+
+
+class Pet(BaseGameData):
+    __slots__ = ('id', 'name', 'kingdom', 'color_mask', 'effect', 'effect_data', 'troop_type', 'filename',
+                 'release_date')
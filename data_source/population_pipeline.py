@@ -0,0 +1,146 @@
+import concurrent.futures
+import threading
+import time
+
+
+class PopulationPipeline:
+    def __init__(self, stages):
+        self.stages = stages
+        self.producers = {}
+        for name, (_, _, outputs) in stages.items():
+            for output in outputs:
+                if output in self.producers:
+                    raise ValueError(f'Stages {self.producers[output]} and {name} both produce {output}.')
+                self.producers[output] = name
+        self.dependencies = {name: {self.producers[i] for i in inputs if i in self.producers}
+                             for name, (_, inputs, _) in stages.items()}
+        self.sources = {name: [i for i in inputs if i not in self.producers]
+                        for name, (_, inputs, _) in stages.items()}
+        self.consumers = {source: name for name, sources in self.sources.items() for source in sources}
+        self.order = self.sort_stages()
+
+    def sort_stages(self):
+        order = []
+        visiting = set()
+
+        def visit(name):
+            if name in order:
+                return
+            if name in visiting:
+                raise ValueError(f'Population stages form a cycle at {name}.')
+            visiting.add(name)
+            for dependency in sorted(self.dependencies[name], key=list(self.stages).index):
+                visit(dependency)
+            visiting.remove(name)
+            order.append(name)
+
+        for stage in self.stages:
+            visit(stage)
+        return order
+
+    def run(self, target, sources, workers=1):
+        run = PipelineRun(self, target)
+        if workers <= 1:
+            run.run(sources, run_now)
+        else:
+            with concurrent.futures.ThreadPoolExecutor(max_workers=workers, thread_name_prefix='populate') as pool:
+                run.run(sources, pool.submit)
+        return run.timings
+
+
+def run_now(function, *args):
+    future = concurrent.futures.Future()
+    future.set_result(function(*args))
+    return future
+
+
+class PipelineRun:
+    def __init__(self, pipeline, target):
+        self.pipeline = pipeline
+        self.target = target
+        self.values = {}
+        self.futures = {}
+        self.timings = []
+
+    def run_stage(self, name, args):
+        method, _, outputs = self.pipeline.stages[name]
+        start = time.perf_counter()
+        getattr(self.target, method)(*args)
+        seconds = time.perf_counter() - start
+        result = getattr(self.target, outputs[0], None)
+        self.timings.append({
+            'stage': name,
+            'seconds': seconds,
+            'count': len(result) if hasattr(result, '__len__') else None,
+            'thread': threading.current_thread().name,
+        })
+
+    def run_inline(self, name):
+        future = concurrent.futures.Future()
+        self.futures[name] = future
+        self.run_stage(name, [self.values.pop(source) for source in self.pipeline.sources[name]])
+        future.set_result(None)
+
+    def is_done(self, name):
+        return name in self.futures and self.futures[name].done()
+
+    def is_ready(self, name):
+        return name not in self.futures \
+            and all(source in self.values for source in self.pipeline.sources[name]) \
+            and all(self.is_done(dependency) for dependency in self.pipeline.dependencies[name])
+
+    def can_finish(self, name):
+        if name in self.futures:
+            return True
+        return all(source in self.values for source in self.pipeline.sources[name]) \
+            and all(self.can_finish(dependency) for dependency in self.pipeline.dependencies[name])
+
+    def check_missing_sources(self):
+        for name in self.pipeline.order:
+            missing = [source for source in self.pipeline.sources[name] if source not in self.values]
+            if name not in self.futures and missing:
+                raise ValueError(f'Population stage {name} is missing its input {", ".join(missing)}.')
+
+    def run(self, sources, submit):
+        self.submit_ready(submit)
+        for source, value in sources:
+            if source not in self.pipeline.consumers:
+                continue
+            name = self.pipeline.consumers[source]
+            self.values[source] = value
+            if self.can_finish(name):
+                del self.values[source]
+                self.wait_for(submit, self.pipeline.dependencies[name])
+                self.values[source] = value
+                self.run_inline(name)
+            else:
+                self.values[source] = list(value)
+            self.submit_ready(submit)
+        self.check_missing_sources()
+        self.wait_for(submit, self.pipeline.stages)
+
+    def submit_ready(self, submit):
+        for name in self.pipeline.order:
+            if self.is_ready(name):
+                args = [self.values.pop(source) for source in self.pipeline.sources[name]]
+                self.futures[name] = submit(self.run_stage, name, args)
+
+    def wait_for(self, submit, names):
+        while not all(self.is_done(name) for name in names):
+            running = [future for future in self.futures.values() if not future.done()]
+            done, _ = concurrent.futures.wait(running, return_when=concurrent.futures.FIRST_COMPLETED)
+            for future in done:
+                future.result()
+            self.submit_ready(submit)
+        for name in names:
+            self.futures[name].result()
+
+
+def format_timings(timings):
+    lines = [f'{"Stage":<16} {"Time":>9} {"Count":>6}  Thread']
+    for timing in timings:
+        count = '-' if timing['count'] is None else timing['count']
+        lines.append(f'{timing["stage"]:<16} {timing["seconds"] * 1000:>7.1f}ms {count:>6}  {timing["thread"]}')
+    total = sum(timing['seconds'] for timing in timings)
+    lines.append(f'{"total":<16} {total * 1000:>7.1f}ms')
+    return lines
@@ -1,12 +1,5 @@
-class Spell:
-    def __init__(self):
-        self.id = None
-        self.name = None
-        self.description = None
-        self.cost = None
-        self.amount = None
-        self.multiplier = None
-        self.boost = None
+from data_source.base_game_data import BaseGameData
 
-    def from_json(self, data):
-        pass
+
+class Spell(BaseGameData):
+    __slots__ = ('id', 'name', 'description', 'cost', 'effects', 'boost')
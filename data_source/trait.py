@@ -1,5 +1,5 @@
-class Trait:
-    def __init__(self):
-        self.name = None
-        self.description = None
+from data_source.base_game_data import BaseGameData
 
+
+class Trait(BaseGameData):
+    __slots__ = ('code', 'name', 'description', 'image')
@@ -1,4 +1,7 @@
+from data_source.base_game_data import BaseGameData
 
-class Weapon:
-    def __init__(self):
-        pass
+
+class Weapon(BaseGameData):
+    __slots__ = ('id', 'name', 'description', 'color_mask', 'rarity', 'type', 'roles', 'spell_id', 'kingdom',
+                 'requirement', 'armor_increase', 'attack_increase', 'health_increase', 'magic_increase', 'affixes',
+                 'class', 'release_date')
@@ -0,0 +1,16 @@
+MAX_FIELD_LENGTH = 1024
+
+
+def split_lines_into_fields(message_lines, subtitle):
+    fields = []
+    message_text = ''
+    field_title = subtitle
+    for line in message_lines:
+        if len(field_title) + len(message_text) + len(line) + len('``````') > MAX_FIELD_LENGTH:
+            fields.append({'name': field_title, 'value': f'```{message_text}```', 'inline': False})
+            message_text = f'{line}\n'
+            field_title = 'Continuation'
+        else:
+            message_text += f'{line}\n'
+    fields.append({'name': field_title, 'value': f'```{message_text}```', 'inline': True})
+    return fields
@@ -0,0 +1,131 @@
+import ctypes
+import ctypes.util
+import os
+import struct
+import time
+
+from base_bot import log
+from game_assets import GameAssets
+
+
+class Inotify:
+    IN_MODIFY = 0x2
+    IN_CLOSE_WRITE = 0x8
+    IN_MOVED_FROM = 0x40
+    IN_MOVED_TO = 0x80
+    IN_CREATE = 0x100
+    IN_DELETE = 0x200
+    IN_Q_OVERFLOW = 0x4000
+    WATCHED_EVENTS = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+    EVENT_HEADER = struct.Struct('iIII')
+
+    def __init__(self, folder):
+        libc = ctypes.CDLL(ctypes.util.find_library('c'), use_errno=True)
+        self.fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), 'inotify_init1 failed')
+        if libc.inotify_add_watch(self.fd, os.fsencode(folder), self.WATCHED_EVENTS) < 0:
+            errno = ctypes.get_errno()
+            os.close(self.fd)
+            raise OSError(errno, f'Could not watch {folder}')
+
+    def read_names(self):
+        names = set()
+        while True:
+            try:
+                data = os.read(self.fd, 64 * 1024)
+            except BlockingIOError:
+                return names
+            offset = 0
+            while offset < len(data):
+                _, mask, _, length = self.EVENT_HEADER.unpack_from(data, offset)
+                offset += self.EVENT_HEADER.size
+                if mask & self.IN_Q_OVERFLOW:
+                    names.add(None)
+                names.add(os.fsdecode(data[offset:offset + length].rstrip(b'\0')))
+                offset += length
+
+    def close(self):
+        if self.fd >= 0:
+            os.close(self.fd)
+            self.fd = -1
+
+
+class FileWatcher:
+    def __init__(self, datasets, debounce_seconds, loaded_hashes):
+        self.datasets = datasets
+        self.debounce_seconds = debounce_seconds
+        self.hashes = {filename: loaded_hashes.get(filename) for filename in datasets}
+        self.stats = {filename: self.stat(filename) for filename in datasets}
+        self.pending = dict.fromkeys(datasets, time.monotonic())
+        self.unaccepted = set()
+        try:
+            self.inotify = Inotify(GameAssets.path('.'))
+            log.debug('Watching game files with inotify.')
+        except (AttributeError, OSError) as e:
+            self.inotify = None
+            log.debug(f'Could not use inotify ({e}), polling game files instead.')
+
+    @staticmethod
+    def hash(filename):
+        if not GameAssets.exists(filename):
+            return None
+        return GameAssets.hash(filename)
+
+    @staticmethod
+    def stat(filename):
+        try:
+            stat = os.stat(GameAssets.path(filename))
+        except FileNotFoundError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def touched_files(self):
+        if self.inotify:
+            try:
+                names = self.inotify.read_names()
+            except OSError as e:
+                log.warning(f'Could not read inotify events ({e}), polling game files instead.')
+                self.close()
+                return list(self.datasets)
+            if None in names:
+                return list(self.datasets)
+            return [name for name in names if name in self.datasets]
+
+        touched = []
+        for filename in self.datasets:
+            stat = self.stat(filename)
+            if stat != self.stats[filename]:
+                self.stats[filename] = stat
+                touched.append(filename)
+        return touched
+
+    def poll(self):
+        now = time.monotonic()
+        for filename in self.touched_files():
+            self.pending[filename] = now
+        settled = [filename for filename, touched in self.pending.items() if now - touched >= self.debounce_seconds]
+        if not settled:
+            return {}
+        for filename in settled:
+            del self.pending[filename]
+        changed = {}
+        for filename in sorted(self.unaccepted.union(settled)):
+            file_hash = self.hash(filename)
+            if file_hash != self.hashes[filename]:
+                changed[filename] = file_hash
+        self.unaccepted = set(changed)
+        return changed
+
+    def accept(self, loaded_hashes):
+        self.hashes.update({filename: file_hash for filename, file_hash in loaded_hashes.items()
+                            if filename in self.datasets})
+        self.unaccepted.difference_update(loaded_hashes)
+
+    def close(self):
+        if self.inotify:
+            self.inotify.close()
+            self.inotify = None
+
+    def describe(self, filenames):
+        return sorted({self.datasets[filename] for filename in filenames})
@@ -1,9 +1,92 @@
+import hashlib
 import json
 import os
 
 from configurations import CONFIG
 
 
+class JsonSectionReader:
+    CHUNK_SIZE = 64 * 1024
+    WHITESPACE = ' \t\n\r'
+
+    def __init__(self, f):
+        self.f = f
+        self.decoder = json.JSONDecoder()
+        self.buffer = ''
+        self.position = 0
+        self.eof = False
+
+    def fill(self):
+        if self.eof:
+            raise ValueError('Unexpected end of JSON document.')
+        chunk = self.f.read(self.CHUNK_SIZE)
+        if not chunk:
+            self.eof = True
+        self.buffer = self.buffer[self.position:] + chunk
+        self.position = 0
+
+    def next_char(self):
+        while True:
+            while self.position < len(self.buffer) and self.buffer[self.position] in self.WHITESPACE:
+                self.position += 1
+            if self.position < len(self.buffer):
+                return self.buffer[self.position]
+            self.fill()
+
+    def expect(self, *chars):
+        char = self.next_char()
+        if char not in chars:
+            raise ValueError(f'Expected {" or ".join(chars)} at offset {self.position}, found {char}.')
+        self.position += 1
+        return char
+
+    def decode(self):
+        self.next_char()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buffer, self.position)
+            except json.JSONDecodeError:
+                if self.eof:
+                    raise
+                self.fill()
+                continue
+            if not self.eof and (end == len(self.buffer) or self.is_truncated(value, end)):
+                self.fill()
+                continue
+            self.position = end
+            return value
+
+    def is_truncated(self, value, end):
+        return not isinstance(value, (dict, list, str)) and self.buffer[end] not in self.WHITESPACE + ',]}'
+
+    def sections(self):
+        self.expect('{')
+        if self.next_char() == '}':
+            return
+        while True:
+            key = self.decode()
+            self.expect(':')
+            if self.next_char() == '[':
+                elements = self.elements()
+                yield key, elements
+                for _ in elements:
+                    pass
+            else:
+                self.decode()
+            if self.expect(',', '}') == '}':
+                return
+
+    def elements(self):
+        self.expect('[')
+        if self.next_char() == ']':
+            self.position += 1
+            return
+        while True:
+            yield self.decode()
+            if self.expect(',', ']') == ']':
+                return
+
+
 class GameAssets:
     @staticmethod
     def load(filename):
@@ -11,10 +94,24 @@ class GameAssets:
         with open(path, encoding='utf8') as f:
             return json.load(f)
 
+    @staticmethod
+    def stream_sections(filename):
+        path = os.path.join(CONFIG.get('game_assets_folder'), filename)
+        with open(path, encoding='utf8') as f:
+            yield from JsonSectionReader(f).sections()
+
     @staticmethod
     def path(filename):
         return os.path.join(CONFIG.get('game_assets_folder'), filename)
 
+    @staticmethod
+    def hash(filename):
+        file_hash = hashlib.sha256()
+        with open(GameAssets.path(filename), 'rb') as f:
+            for block in iter(lambda: f.read(1024 * 1024), b''):
+                file_hash.update(block)
+        return file_hash.hexdigest()
+
     @staticmethod
     def exists(filename):
         path = os.path.join(CONFIG.get('game_assets_folder'), filename)
@@ -1,12 +1,25 @@
+import bisect
+import contextlib
+import copy
 import datetime
-import importlib
+import functools
+import itertools
 import logging
 import operator
-import re
+import threading
+import time
+
+import prettytable
 
 import translations
+from configurations import CONFIG
 from data_source.game_data import GameData
+from data_source.game_data_snapshot import load_game_data
+from embed_fields import split_lines_into_fields
 from game_constants import COLORS, TROOP_RARITIES, WEAPON_RARITIES
+from search_index import SearchIndex, extract_search_tag
+from spell_template import SpellTemplate
+from translation_cache import TranslationCache
 
 LOGLEVEL = logging.DEBUG
 
@@ -19,51 +32,325 @@ log = logging.getLogger(__name__)
 log.setLevel(LOGLEVEL)
 log.addHandler(handler)
 
-_ = translations.Translations().get
 
+active_translations = translations.Translations()
+translation_scope = threading.local()
 
-def update_translations():
-    global _
-    importlib.reload(translations)
-    del _
-    _ = translations.Translations().get
 
+def _(key, lang=''):
+    return (getattr(translation_scope, 'translations', None) or active_translations).get(key, lang)
 
-def extract_search_tag(search_term):
-    ignored_characters = ' -\'’'
-    for char in ignored_characters:
-        search_term = search_term.replace(char, '')
-    return search_term.lower()
 
+@contextlib.contextmanager
+def translations_in_scope(scoped_translations):
+    previous = getattr(translation_scope, 'translations', None)
+    translation_scope.translations = scoped_translations
+    try:
+        yield
+    finally:
+        translation_scope.translations = previous
 
-class TeamExpander:
 
-    def __init__(self):
-        world = GameData()
-        world.populate_world_data()
+def in_translation_scope(method):
+    @functools.wraps(method)
+    def scoped(self, *args, **kwargs):
+        previous = getattr(translation_scope, 'translations', None)
+        translation_scope.translations = self.translations
+        try:
+            return method(self, *args, **kwargs)
+        finally:
+            translation_scope.translations = previous
+
+    return scoped
+
+
+class TeamExpander:
+    ENTITY_KINDS = {
+        'troop': 'troops',
+        'kingdom': 'kingdoms',
+        'class': 'classes',
+        'pet': 'pets',
+        'weapon': 'weapons',
+        'traitstone': 'traitstones',
+    }
+    versions = itertools.count(1)
+    FUZZY_SEARCH_KINDS = ('troop', 'kingdom', 'class', 'pet', 'weapon')
+    CROSS_LANGUAGE_SEARCH_KINDS = ('troop', 'kingdom', 'class', 'pet', 'weapon')
+    SPOILER_WINDOW = datetime.timedelta(days=180)
+    SEARCH_INDEX_KINDS = ('troop', 'kingdom', 'class', 'pet', 'weapon', 'affix', 'trait', 'talent', 'traitstone')
+    RELOADED_SEARCH_INDEXES = {
+        'Spells': ('affix',),
+        'Traits': ('trait', 'talent'),
+        'Troops': ('troop',),
+        'Weapons': ('weapon', 'affix'),
+        'Pets': ('pet',),
+        'User': ('traitstone',),
+    }
+
+    def __init__(self, expander_translations=None):
+        self.version = next(self.versions)
+        self.translations = expander_translations or active_translations
+        with translations_in_scope(self.translations):
+            self.world = load_game_data()
+            self.use_world(self.world)
+            self.rooms = {}
+            self.translation_cache = TranslationCache(CONFIG.get('translation_cache_size'))
+            self.spell_templates = {}
+            self.populate_spell_templates(translations.CANONICAL_LANGUAGES)
+            self.search_indexes = {}
+            self.cross_language_names = {}
+            self.populate_search_indexes(translations.CANONICAL_LANGUAGES)
+            self.team_elements = {}
+            self.populate_team_elements(translations.CANONICAL_LANGUAGES)
+            self.summaries = {}
+            self.populate_summaries(translations.CANONICAL_LANGUAGES)
+            self.translated_campaign_tasks = {}
+            self.populate_translated_campaign_tasks(translations.CANONICAL_LANGUAGES)
+            self.time_dependent_days = None
+            self.refresh_lock = threading.Lock()
+            self.refresh_time_dependent_data()
+
+    def use_world(self, world):
         self.troops = world.troops
         self.spells = world.spells
         self.weapons = world.weapons
+        self.weapon_positions = {weapon_id: i for i, weapon_id in enumerate(self.weapons)}
+        self.affix_weapon_ids = world.affix_weapon_ids
         self.classes = world.classes
         self.banners = world.banners
         self.traits = world.traits
+        self.trait_troop_ids = world.trait_troop_ids
+        self.trait_class_ids = world.trait_class_ids
+        self.trait_talent_trees = world.trait_talent_trees
         self.kingdoms = world.kingdoms
         self.pet_effects = world.pet_effects
         self.pets = world.pets
         self.talent_trees = world.talent_trees
         self.spoilers = world.spoilers
+        self.spoiler_index = world.spoiler_index
         self.events = world.events
+        self.event_index = world.event_index
+        self.daily_rows = {}
         self.campaign_tasks = world.campaign_tasks
+        self.current_soulforge_weapon_ids = world.current_soulforge_weapon_ids
         self.soulforge = world.soulforge
         self.traitstones = world.traitstones
         self.levels = world.levels
-        self.rooms = {}
+
+    @property
+    def file_hashes(self):
+        return {**self.world.file_hashes, **self.translations.file_hashes}
+
+    def copy(self, world, expander_translations):
+        expander = copy.copy(self)
+        expander.version = next(self.versions)
+        expander.translations = expander_translations
+        expander.world = world
+        expander.use_world(world)
+        expander.translation_cache = TranslationCache(self.translation_cache.max_size)
+        expander.spell_templates = {lang: dict(templates) for lang, templates in self.spell_templates.items()}
+        expander.search_indexes = {lang: dict(indexes) for lang, indexes in self.search_indexes.items()}
+        expander.cross_language_names = dict(self.cross_language_names)
+        expander.team_elements = dict(self.team_elements)
+        expander.summaries = dict(self.summaries)
+        expander.translated_campaign_tasks = dict(self.translated_campaign_tasks)
+        expander.time_dependent_days = None
+        expander.refresh_lock = threading.Lock()
+        return expander
+
+    def reload(self, filenames):
+        start = time.perf_counter()
+        reloaded_languages = [lang for lang in translations.CANONICAL_LANGUAGES
+                              if f'GemsOfWar_{translations.LANGUAGES[lang]}.json' in filenames]
+        expander_translations = self.translations
+        if reloaded_languages:
+            expander_translations = translations.Translations(self.translations, reloaded_languages)
+        with self.refresh_lock:
+            world = self.world
+            changes = {}
+            if set(filenames) - set(translations.LANG_FILES):
+                new_data = GameData()
+                new_data.read_json_data(None if 'World.json' in filenames else self.world)
+                world = self.world.copy()
+                changes = world.apply_changes(new_data)
+                if changes is None:
+                    return None
+            data_time = time.perf_counter() - start
+            expander = self.copy(world, expander_translations)
+        with translations_in_scope(expander_translations):
+            index_kinds = expander.apply_reload(changes, reloaded_languages)
+
+        change_summary = ', '.join(
+            f'{section} {len(keys["changed"]) + len(keys["added"]) + len(keys["removed"])}'
+            for section, keys in changes.items())
+        log.info(f'Reloaded {", ".join(filenames)} in {time.perf_counter() - start:.3f}s '
+                 f'(game data {data_time:.3f}s). Changed entries: {change_summary or "none"}, '
+                 f'rebuilt languages: {", ".join(reloaded_languages) or "none"}, '
+                 f'rebuilt search indexes: {", ".join(sorted(index_kinds)) or "none"}.')
+        return expander
+
+    def apply_reload(self, changes, reloaded_languages):
+        if reloaded_languages:
+            self.populate_spell_templates(reloaded_languages)
+            self.populate_search_indexes(reloaded_languages)
+            self.populate_team_elements(reloaded_languages)
+            self.populate_summaries(reloaded_languages)
+            self.populate_translated_campaign_tasks(reloaded_languages)
+        other_languages = [lang for lang in translations.CANONICAL_LANGUAGES if lang not in reloaded_languages]
+        if 'Spells' in changes:
+            self.populate_spell_templates(other_languages, changes['Spells']['changed'])
+        index_kinds = {kind for section in changes for kind in self.RELOADED_SEARCH_INDEXES.get(section, ())}
+        self.populate_search_indexes(other_languages, sorted(index_kinds))
+        if 'Troops' in changes or 'Weapons' in changes:
+            self.populate_team_elements(other_languages)
+        if changes:
+            self.populate_translated_campaign_tasks(other_languages)
+        self.refresh_time_dependent_data()
+        return index_kinds
+
+    def populate_spell_templates(self, languages, spell_ids=None):
+        spells = self.spells
+        if spell_ids is not None:
+            spells = {spell_id: self.spells[spell_id] for spell_id in spell_ids}
+        for lang in languages:
+            magic = _('[MAGIC]', lang)
+            self.spell_templates.setdefault(lang, {}).update({
+                spell_id: SpellTemplate.compile(spell, _(spell.name, lang), _(spell.description, lang), magic)
+                for spell_id, spell in spells.items()
+            })
+
+    def populate_team_elements(self, languages):
+        for lang in languages:
+            elements = {}
+            for banner_id, banner in self.banners.items():
+                elements[banner_id] = ('banner', self.translate_banner(banner, lang))
+            for class_id, _class in self.classes.items():
+                elements[class_id] = ('class', _(_class.name, lang))
+            for weapon_id, weapon in self.weapons.items():
+                elements[weapon_id] = ('weapon', ("".join(weapon.colors),
+                                                  _(weapon.name, lang) + ' :crossed_swords:'))
+            for troop_id, troop in self.troops.items():
+                if troop.name == '`?`':
+                    continue
+                elements[troop_id] = ('troop', ("".join(troop.colors), _(troop.name, lang)))
+            self.team_elements[lang] = elements
+
+    def populate_search_indexes(self, languages, kinds=SEARCH_INDEX_KINDS):
+        for lang in languages:
+            indexes = self.search_indexes.setdefault(lang, {})
+            for kind in kinds:
+                indexes[kind] = self.build_search_index(kind, lang)
+        self.populate_cross_language_names(kinds)
+
+    def populate_cross_language_names(self, kinds):
+        languages = sorted(self.search_indexes, key=lambda lang: lang != translations.Translations.BASE_LANG)
+        for kind in kinds:
+            if kind not in self.CROSS_LANGUAGE_SEARCH_KINDS:
+                continue
+            names = {}
+            for lang in languages:
+                for tag, _id in self.search_indexes[lang][kind].exact_matches.items():
+                    names.setdefault(tag, _id)
+            self.cross_language_names[kind] = names
+        self.search_languages = languages
+
+    def build_search_index(self, kind, lang):
+        if kind in ('kingdom', 'class', 'pet', 'weapon'):
+            return self.build_name_index(getattr(self, self.ENTITY_KINDS[kind]), lang)
+        return getattr(self, f'build_{kind}_index')(lang)
+
+    def build_troop_index(self, lang):
+        index = SearchIndex()
+        for troop in self.troops.values():
+            if troop.name == '`?`':
+                continue
+            kingdom = _(troop.kingdom.name, lang) if troop.kingdom else ''
+            _type = ' / '.join([_(f'[TROOPTYPE_{_type.upper()}]', lang) for _type in troop.types])
+            roles = ''.join([_(f'[TROOP_ROLE_{role.upper()}]', lang) for role in troop.roles])
+            index.add(troop.id, _(troop.name, lang), kingdom, _type, roles)
+        return index
+
+    @staticmethod
+    def build_name_index(entities, lang):
+        index = SearchIndex()
+        for entity in entities.values():
+            index.add(entity.id, _(entity.name, lang))
+        return index
+
+    def build_trait_index(self, lang):
+        index = SearchIndex()
+        for code, trait in self.traits.items():
+            index.add(code, _(trait.name, lang), _(trait.description, lang))
+        return index
+
+    def build_talent_index(self, lang):
+        index = SearchIndex()
+        for code, tree in self.talent_trees.items():
+            index.add(code, _(tree['name'], lang), *[_(t['name'], lang) for t in tree['talents']])
+        return index
+
+    def build_traitstone_index(self, lang):
+        index = SearchIndex()
+        for traitstone_name, traitstone in self.traitstones.items():
+            index.add(traitstone_name, _(traitstone['name'], lang))
+        return index
+
+    def build_affix_index(self, lang):
+        index = SearchIndex()
+        for spell_id in self.affix_weapon_ids:
+            affix = self.translate_spell(spell_id, lang)
+            index.add(spell_id, affix['name'], affix['description'])
+        return index
+
+    def populate_summaries(self, languages):
+        for lang in languages:
+            self.summaries[lang] = {
+                'class': self.build_summary(
+                    'class', lang, _('[CLASS]', lang),
+                    [_('[NAME_A_Z]', lang), _('[FILTER_TROOPTYPE]', lang), _('[FILTER_KINGDOMS]', lang)],
+                    lambda _class: [_class['name'], _class['type_short'], _class['kingdom']]),
+                'kingdom': self.build_summary(
+                    'kingdom', lang, _('[KINGDOMS]', lang),
+                    [_('[NAME_A_Z]', lang), _('[TROOPS]', lang), _('[FACTIONS]', lang)],
+                    lambda kingdom: [kingdom['name'], len(kingdom['troops']), kingdom['linked_kingdom'] or '-']),
+            }
+
+    def build_summary(self, kind, lang, title, field_names, get_row):
+        index = self.get_search_index(kind, lang)
+        matches = index.search('summary', getattr(self, f'get_{kind}_summary_ids')())
+        result = [self.translate_entity_copy(kind, _id, lang) for _id in matches]
+        result.sort(key=operator.itemgetter('name'))
+
+        table = prettytable.PrettyTable()
+        table.field_names = field_names
+        table.align = 'l'
+        table.hrules = prettytable.HEADER
+        table.vrules = prettytable.NONE
+        [table.add_row(get_row(entity)) for entity in result]
+
+        return {
+            'title': title,
+            'fields': split_lines_into_fields(table.get_string().split('\n'), _('[OVERVIEW]', lang)),
+        }
+
+    @staticmethod
+    def canonical_language(lang):
+        if lang not in translations.LANGUAGES:
+            return translations.Translations.BASE_LANG
+        return translations.LANGUAGE_CODE_MAPPING.get(lang, lang)
+
+    def get_summary(self, kind, lang):
+        return self.summaries[self.canonical_language(lang)][kind]
+
+    def get_search_index(self, kind, lang):
+        return self.search_indexes[self.canonical_language(lang)][kind]
 
     @classmethod
     def extract_code_from_message(cls, raw_code):
         numbers = [int(n.strip()) for n in raw_code.split(',') if n]
         return numbers
 
+    @in_translation_scope
     def get_team_from_code(self, code, lang):
         result = {
             'troops': [],
@@ -75,37 +362,21 @@ class TeamExpander:
         }
         has_weapon = False
         has_class = False
+        elements = self.team_elements[self.canonical_language(lang)]
 
         for element in code:
-            troop = self.troops.get(element)
-            weapon = self.weapons.get(element)
-            if troop:
-                color_code = "".join(troop["colors"])
-                troop_name = _(troop['name'], lang)
-                result['troops'].append([color_code, troop_name])
-                continue
-            elif weapon:
-                color_code = "".join(weapon["colors"])
-                weapon_name = _(weapon['name'], lang)
-                result['troops'].append([color_code, weapon_name + ' :crossed_swords:'])
-                has_weapon = True
-                continue
-
-            _class = self.classes.get(element)
-            if _class:
-                result['class'] = _(_class['name'], lang)
-                result['class_talents'] = _class['talents']
+            kind, fragment = elements.get(element, (None, None))
+            if kind in ('troop', 'weapon'):
+                result['troops'].append(list(fragment))
+                has_weapon |= kind == 'weapon'
+            elif kind == 'class':
+                result['class'] = fragment
+                result['class_talents'] = self.classes[element]['talents']
                 has_class = True
-                continue
-
-            banner = self.banners.get(element)
-            if banner:
-                result['banner'] = self.translate_banner(banner, lang)
-                continue
-
-            if 0 <= element <= 3:
+            elif kind == 'banner':
+                result['banner'] = fragment
+            elif 0 <= element <= 3:
                 result['talents'].append(element)
-                continue
 
         if has_weapon and has_class:
             new_talents = []
@@ -121,39 +392,73 @@ class TeamExpander:
 
         return result
 
+    @in_translation_scope
     def get_team_from_message(self, user_code, lang):
         code = self.extract_code_from_message(user_code)
         if not code:
             return
         return self.get_team_from_code(code, lang)
 
+    @in_translation_scope
+    def get_teams_from_codes(self, codes, lang):
+        return [self.get_team_from_code(code, lang) for code in codes]
+
+    @in_translation_scope
+    def get_teams_from_messages(self, user_codes, lang):
+        codes = [self.extract_code_from_message(user_code) for user_code in user_codes]
+        return self.get_teams_from_codes([code for code in codes if code], lang)
+
+    @in_translation_scope
     def search_troop(self, search_term, lang):
-        if search_term.isdigit() and int(search_term) in self.troops:
-            troop = self.troops.get(int(search_term))
-            if troop:
-                result = troop.copy()
-                self.translate_troop(result, lang)
-                return [result]
-            return []
-        else:
-            possible_matches = []
-            for base_troop in self.troops.values():
-                if base_troop['name'] == '`?`':
-                    continue
-                troop = base_troop.copy()
-                self.translate_troop(troop, lang)
-                name = extract_search_tag(troop['name'])
-                kingdom = extract_search_tag(troop['kingdom'])
-                _type = extract_search_tag(troop['type'])
-                roles = extract_search_tag(''.join(troop['roles']))
-                real_search = extract_search_tag(search_term)
+        return self.search_entities('troop', search_term, lang)
 
-                if real_search == name:
-                    return [troop]
-                elif real_search in name or real_search in kingdom or real_search in _type or real_search in roles:
-                    possible_matches.append(troop)
+    def search_entities(self, kind, search_term, lang, overview_ids=()):
+        entities = getattr(self, self.ENTITY_KINDS[kind])
+        if search_term.isdigit() and int(search_term) in entities:
+            return [self.translate_entity(kind, int(search_term), lang)]
 
-            return sorted(possible_matches, key=operator.itemgetter('name'))
+        index = self.get_search_index(kind, lang)
+        matches = index.search(search_term, overview_ids)
+        if not matches:
+            matches = self.search_other_languages(kind, search_term, lang)
+        return self.get_search_results(kind, index, matches, lang, full_results=bool(overview_ids))
+
+    def search_other_languages(self, kind, search_term, lang):
+        real_search = extract_search_tag(search_term)
+        if real_search in self.cross_language_names[kind]:
+            return [self.cross_language_names[kind][real_search]]
+
+        lang = self.canonical_language(lang)
+        matches = set()
+        for other_lang in self.search_languages:
+            if other_lang != lang:
+                matches.update(self.search_indexes[other_lang][kind].find(real_search))
+        return self.get_search_index(kind, lang).sort(matches)
+
+    @in_translation_scope
+    def search_fuzzy(self, kind, search_term, lang):
+        if kind not in self.FUZZY_SEARCH_KINDS:
+            return []
+        index = self.get_search_index(kind, lang)
+        matches = index.fuzzy_search(search_term)
+        return self.get_search_results(kind, index, matches, lang)
+
+    def get_search_results(self, kind, index, matches, lang, full_results=False):
+        if len(matches) == 1 or full_results:
+            return [self.translate_entity(kind, _id, lang) for _id in matches]
+        return [{'id': _id, 'name': index.get_name(_id)} for _id in matches]
+
+    @in_translation_scope
+    def translate_entity(self, kind, entity_id, lang):
+        lang = self.canonical_language(lang)
+        return self.translation_cache.get(kind, entity_id, lang,
+                                          lambda: self.translate_entity_copy(kind, entity_id, lang))
+
+    @in_translation_scope
+    def translate_entity_copy(self, kind, entity_id, lang):
+        entity = getattr(self, self.ENTITY_KINDS[kind])[entity_id].copy()
+        getattr(self, f'translate_{kind}')(entity, lang)
+        return entity
 
     def translate_troop(self, troop, lang):
         troop['name'] = _(troop['name'], lang)
@@ -177,7 +482,7 @@ class TeamExpander:
         ]
         troop['type'] = ' / '.join(types)
         troop['kingdom_title'] = _('[KINGDOM]', lang)
-        troop['kingdom'] = _(troop['kingdom']['Name'], lang)
+        troop['kingdom'] = _(troop['kingdom']['name'], lang) if troop['kingdom'] else ''
         troop['spell'] = self.translate_spell(troop['spell_id'], lang)
         troop['spell_title'] = _('[TROOPHELP_SPELL0]', lang)
         if 'traitstones' not in troop:
@@ -197,26 +502,13 @@ class TeamExpander:
             new_traits.append(new_trait)
         return new_traits
 
+    @in_translation_scope
     def search_kingdom(self, search_term, lang):
-        if search_term.isdigit() and int(search_term) in self.kingdoms:
-            result = self.kingdoms.get(int(search_term)).copy()
-            self.translate_kingdom(result, lang)
-            return [result]
-        else:
-            possible_matches = []
-            for kingdom in self.kingdoms.values():
-                translated_name = extract_search_tag(_(kingdom['name'], lang))
-                real_search = extract_search_tag(search_term)
-                if real_search == translated_name:
-                    result = kingdom.copy()
-                    self.translate_kingdom(result, lang)
-                    return [result]
-                elif real_search in translated_name or \
-                        (search_term == 'summary' and not kingdom['underworld'] and len(kingdom['colors']) > 0):
-                    result = kingdom.copy()
-                    self.translate_kingdom(result, lang)
-                    possible_matches.append(result)
-            return sorted(possible_matches, key=operator.itemgetter('name'))
+        summary_ids = self.get_kingdom_summary_ids() if search_term == 'summary' else []
+        return self.search_entities('kingdom', search_term, lang, summary_ids)
+
+    def get_kingdom_summary_ids(self):
+        return [k['id'] for k in self.kingdoms.values() if not k['underworld'] and len(k['colors']) > 0]
 
     def translate_kingdom(self, kingdom, lang):
         kingdom['name'] = _(kingdom['name'], lang)
@@ -250,33 +542,19 @@ class TeamExpander:
             kingdom['primary_stat'] = _(f'[{kingdom["primary_stat"].upper()}]', lang)
         if 'pet' in kingdom:
             kingdom['pet_title'] = _('[PET_RESCUE_PET]', lang)
-            pet = kingdom['pet'].copy()
-            self.translate_pet(pet, lang)
-            kingdom['pet'] = pet
+            kingdom['pet'] = self.translate_entity('pet', kingdom['pet']['id'], lang)
         if 'event_weapon' in kingdom:
             kingdom['event_weapon_title'] = _('[FACTION_WEAPON]', lang)
             kingdom['event_weapon_id'] = kingdom['event_weapon']['id']
             kingdom['event_weapon'] = _(kingdom['event_weapon']['name'], lang)
 
+    @in_translation_scope
     def search_class(self, search_term, lang):
-        if search_term.isdigit() and int(search_term) in self.classes:
-            result = self.classes.get(int(search_term)).copy()
-            self.translate_class(result, lang)
-            return [result]
-        else:
-            possible_matches = []
-            for _class in self.classes.values():
-                translated_name = extract_search_tag(_(_class['name'], lang))
-                real_search = extract_search_tag(search_term)
-                if real_search == translated_name:
-                    result = _class.copy()
-                    self.translate_class(result, lang)
-                    return [result]
-                elif real_search in translated_name or search_term == 'summary':
-                    result = _class.copy()
-                    self.translate_class(result, lang)
-                    possible_matches.append(result)
-            return sorted(possible_matches, key=operator.itemgetter('name'))
+        summary_ids = self.get_class_summary_ids() if search_term == 'summary' else []
+        return self.search_entities('class', search_term, lang, summary_ids)
+
+    def get_class_summary_ids(self):
+        return list(self.classes)
 
     def translate_class(self, _class, lang):
         kingdom = self.kingdoms[_class['kingdom_id']]
@@ -305,13 +583,13 @@ class TeamExpander:
         _class['weapon_bonus'] = _('[MAGIC_BONUS]', lang) + " " + _(
             f'[MAGIC_BONUS_{COLORS.index(_class["weapon_color"])}]', lang)
 
+    @in_translation_scope
     def search_talent(self, search_term, lang):
+        real_search = extract_search_tag(search_term)
+        index = self.get_search_index('talent', lang)
         possible_matches = []
-        for tree in self.talent_trees.values():
-            translated_name = extract_search_tag(_(tree['name'], lang))
-            translated_talents = [_(t['name'], lang) for t in tree['talents']]
-            talents_search_tags = [extract_search_tag(t) for t in translated_talents]
-            real_search = extract_search_tag(search_term)
+        for code, tree in self.talent_trees.items():
+            translated_name, *talents_search_tags = index.get_tags(code)
             if real_search == translated_name or real_search in talents_search_tags:
                 result = tree.copy()
                 self.translate_talent_tree(result, lang)
@@ -347,55 +625,35 @@ class TeamExpander:
         ]
 
     def get_troops_with_trait(self, trait, lang):
-        troops = []
-        for troop in self.troops.values():
-            trait_codes = [t['code'] for t in troop['traits']] if 'traits' in troop else []
-            if trait['code'] in trait_codes:
-                translated_troop = troop.copy()
-                self.translate_troop(translated_troop, lang)
-                troops.append(translated_troop)
-        return troops
+        return self.get_trait_users('troop', self.trait_troop_ids, trait['code'], lang)
+
+    def get_trait_users(self, kind, trait_users, code, lang):
+        index = self.get_search_index(kind, lang)
+        return [{'id': _id, 'name': index.get_name(_id)} for _id in trait_users.get(code, [])]
 
+    @in_translation_scope
     def search_trait(self, search_term, lang):
+        real_search = extract_search_tag(search_term)
+        index = self.get_search_index('trait', lang)
         possible_matches = []
-        for code, trait in self.traits.items():
-            translated_name = extract_search_tag(_(trait['name'], lang))
-            translated_description = extract_search_tag(_(trait['description'], lang))
-            real_search = extract_search_tag(search_term)
-            if real_search == translated_name:
-                result = trait.copy()
-                result['troops'] = self.get_troops_with_trait(trait, lang)
-                result['troops_title'] = _('[TROOPS]', lang)
-                if result['troops']:
-                    possible_matches.append(result)
-                    break
-            elif real_search in translated_name or real_search in translated_description:
-                result = trait.copy()
-                result['troops'] = self.get_troops_with_trait(trait, lang)
-                result['troops_title'] = _('[TROOPS]', lang)
-                if result['troops']:
-                    possible_matches.append(result)
+        for code in index.match(search_term):
+            if not self.trait_troop_ids.get(code):
+                continue
+            result = self.traits[code].copy()
+            result['troops'] = self.get_troops_with_trait(result, lang)
+            result['troops_title'] = _('[TROOPS]', lang)
+            result['classes'] = self.get_trait_users('class', self.trait_class_ids, code, lang)
+            result['classes_title'] = _('[CLASS]', lang)
+            result['talent_trees'] = self.get_trait_users('talent', self.trait_talent_trees, code, lang)
+            result['talent_trees_title'] = _('[TALENT_TREES]', lang)
+            possible_matches.append(result)
+            if real_search == index.get_tag(code):
+                break
         return sorted(self.enrich_traits(possible_matches, lang), key=operator.itemgetter('name'))
 
+    @in_translation_scope
     def search_pet(self, search_term, lang):
-        if search_term.isdigit() and int(search_term) in self.pets:
-            result = self.pets.get(int(search_term)).copy()
-            self.translate_pet(result, lang)
-            return [result]
-        else:
-            possible_matches = []
-            for pet in self.pets.values():
-                translated_name = extract_search_tag(_(pet['name'], lang))
-                real_search = extract_search_tag(search_term)
-                if real_search == translated_name:
-                    result = pet.copy()
-                    self.translate_pet(result, lang)
-                    return [result]
-                elif real_search in translated_name:
-                    result = pet.copy()
-                    self.translate_pet(result, lang)
-                    possible_matches.append(result)
-            return sorted(possible_matches, key=operator.itemgetter('name'))
+        return self.search_entities('pet', search_term, lang)
 
     def translate_pet(self, pet, lang):
         pet['name'] = _(pet['name'], lang)
@@ -427,27 +685,9 @@ class TeamExpander:
                 pet['effect'] = _(f'[PET_{pet["colors"][0].upper()}_BUFF]', lang)
         pet['effect_title'] = _('[PET_TYPE]', lang)
 
+    @in_translation_scope
     def search_weapon(self, search_term, lang):
-        if search_term.isdigit() and int(search_term) in self.weapons:
-            weapon = self.weapons.get(int(search_term))
-            if weapon:
-                result = weapon.copy()
-                self.translate_weapon(result, lang)
-                return [result]
-            return []
-        possible_matches = []
-        for weapon in self.weapons.values():
-            translated_name = extract_search_tag(_(weapon['name'], lang))
-            real_search = extract_search_tag(search_term)
-            if real_search == translated_name:
-                result = weapon.copy()
-                self.translate_weapon(result, lang)
-                return [result]
-            elif real_search in translated_name:
-                result = weapon.copy()
-                self.translate_weapon(result, lang)
-                possible_matches.append(result)
-        return sorted(possible_matches, key=operator.itemgetter('name'))
+        return self.search_entities('weapon', search_term, lang)
 
     def translate_weapon(self, weapon, lang):
         weapon['name'] = _(weapon['name'], lang)
@@ -500,41 +740,34 @@ class TeamExpander:
         elif weapon['requirement'] == 1003:
             weapon['requirement_text'] = _('[SOULFORGE_WEAPONS_TAB_EMPTY_ERROR]', lang)
 
+    @in_translation_scope
     def search_affix(self, search_term, lang):
         real_search = extract_search_tag(search_term)
+        weapon_index = self.get_search_index('weapon', lang)
         results = {}
-        for weapon in self.weapons.values():
-            my_weapon = weapon.copy()
-            self.translate_weapon(my_weapon, lang)
-            affixes = [affix for affix in my_weapon['upgrades'] if 'cost' in affix]
-            for affix in affixes:
-                search_name = extract_search_tag(affix['name'])
-                search_desc = extract_search_tag(affix['description'])
-                if real_search == search_name \
-                        or real_search == search_desc \
-                        or real_search in search_name \
-                        or real_search in search_desc:
-                    if affix['name'] in results:
-                        results[affix['name']]['weapons'].append(my_weapon)
-                        results[affix['name']]['num_weapons'] += 1
-                    else:
-                        results[affix['name']] = affix.copy()
-                        results[affix['name']]['weapons_title'] = _('[SOULFORGE_TAB_WEAPONS]', lang)
-                        results[affix['name']]['weapons'] = [my_weapon]
-                        results[affix['name']]['num_weapons'] = 1
+        for spell_id in self.get_search_index('affix', lang).match(search_term):
+            affix = self.translate_spell(spell_id, lang)
+            if affix['name'] in results:
+                results[affix['name']]['weapon_ids'] += self.affix_weapon_ids[spell_id]
+            else:
+                results[affix['name']] = affix
+                affix['weapons_title'] = _('[SOULFORGE_TAB_WEAPONS]', lang)
+                affix['weapon_ids'] = list(self.affix_weapon_ids[spell_id])
+        for affix in results.values():
+            weapon_ids = sorted(affix.pop('weapon_ids'), key=self.weapon_positions.get)
+            affix['weapons'] = [{'id': _id, 'name': weapon_index.get_name(_id)} for _id in weapon_ids]
+            affix['num_weapons'] = len(weapon_ids)
         for name, affix in results.items():
             if real_search == extract_search_tag(name):
                 return [affix]
         return sorted(results.values(), key=operator.itemgetter('name'))
 
+    @in_translation_scope
     def search_traitstone(self, search_term, lang):
         real_search = extract_search_tag(search_term)
-        result = []
-        for traitstone in self.traitstones.values():
-            translated_traitstone = traitstone.copy()
-            self.translate_traitstone(translated_traitstone, lang)
-            if real_search in extract_search_tag(translated_traitstone['name']):
-                result.append(translated_traitstone)
+        index = self.get_search_index('traitstone', lang)
+        result = [self.translate_entity('traitstone', traitstone_name, lang) for traitstone_name in self.traitstones
+                  if real_search in index.get_tag(traitstone_name)]
         return sorted(result, key=operator.itemgetter('name'))
 
     def translate_traitstone(self, traitstone, lang):
@@ -562,51 +795,9 @@ class TeamExpander:
         traitstone['classes_title'] = _('[CLASS]', lang)
         traitstone['kingdoms_title'] = _('[KINGDOMS]', lang)
 
+    @in_translation_scope
     def translate_spell(self, spell_id, lang):
-        spell = self.spells[spell_id]
-        magic = _('[MAGIC]', lang)
-
-        description = _(spell['description'], lang)
-
-        for i, (multiplier, amount) in enumerate(spell['effects'], start=1):
-            spell_amount = f' + {amount}' if amount else ''
-            multiplier_text = ''
-            if multiplier > 1:
-                if multiplier == int(multiplier):
-                    multiplier_text = f'{multiplier:.0f} ⨯ '
-                else:
-                    multiplier_text = f'{multiplier} ⨯ '
-            divisor = ''
-            if multiplier < 1:
-                number = int(round(1 / multiplier))
-                divisor = f' / {number}'
-            damage = f'[{multiplier_text}{magic}{divisor}{spell_amount}]'
-            number_of_replacements = len(re.findall(r'\{\d\}', description))
-            has_half_replacement = len(spell['effects']) == number_of_replacements - 1
-            if '{2}' in description and has_half_replacement:
-                multiplier *= 0.5
-                amount *= 0.5
-                if amount == int(amount):
-                    amount = int(amount)
-                half_damage = f'[{multiplier} ⨯ {magic}{divisor} + {amount}]'
-                description = description.replace('{1}', half_damage)
-                description = description.replace('{2}', damage)
-            else:
-                description = description.replace(f'{{{i}}}', damage)
-
-        boost = ''
-        if spell['boost'] and spell['boost'] > 100:
-            boost = f' [x{int(round(spell["boost"] / 100))}]'
-        elif spell['boost'] and spell['boost'] != 1 and spell['boost'] <= 100:
-            boost = f' [{100 / spell["boost"]:0.0f}:1]'
-
-        description = f'{description}{boost}'
-
-        return {
-            'name': _(spell['name'], lang),
-            'cost': spell['cost'],
-            'description': description,
-        }
+        return self.spell_templates[self.canonical_language(lang)][spell_id].render()
 
     @staticmethod
     def translate_banner(banner, lang):
@@ -617,10 +808,57 @@ class TeamExpander:
         }
         return result
 
-    def get_events(self, lang):
+    @in_translation_scope
+    def refresh_time_dependent_data(self):
         today = datetime.date.today()
-        events = [self.translate_event(e, lang) for e in self.events if today <= e['start']]
-        return events
+        utc_today = datetime.datetime.utcnow().date()
+        if self.time_dependent_days == (today, utc_today):
+            return False
+        if not self.refresh_lock.acquire(blocking=False):
+            log.debug('Game data is being reloaded, postponing the time dependent refresh.')
+            return False
+        try:
+            if self.world.refresh_current_week(today):
+                self.campaign_tasks = self.world.campaign_tasks
+                self.populate_translated_campaign_tasks(translations.CANONICAL_LANGUAGES)
+                log.info(f'Switched campaign tasks to event kingdom {self.world.event_kingdom_id}.')
+            self.current_soulforge_weapon_ids = self.world.current_soulforge_weapon_ids
+            self.daily_rows = {
+                'events': (today, {lang: self.build_event_rows(today, lang)
+                                   for lang in translations.CANONICAL_LANGUAGES}),
+                'spoilers': (utc_today, {lang: self.build_spoiler_rows(utc_today, lang)
+                                         for lang in translations.CANONICAL_LANGUAGES}),
+            }
+            self.time_dependent_days = (today, utc_today)
+        finally:
+            self.refresh_lock.release()
+        return True
+
+    def get_daily_rows(self, name, today, lang, build):
+        lang = self.canonical_language(lang)
+        day, rows = self.daily_rows.get(name, (None, {}))
+        if day != today:
+            rows = {}
+            self.daily_rows[name] = (today, rows)
+        if lang not in rows:
+            rows[lang] = build(today, lang)
+        return rows[lang]
+
+    @in_translation_scope
+    def get_events(self, lang):
+        return self.get_daily_rows('events', datetime.date.today(), lang, self.build_event_rows)
+
+    def build_event_rows(self, today, lang):
+        return [entry for event, entry in self.translate_rows(self.event_index.starting_from(today),
+                                                              self.translate_event, lang)]
+
+    @staticmethod
+    def translate_rows(rows, translate, lang):
+        for row in rows:
+            try:
+                yield row, translate(row, lang)
+            except (KeyError, TypeError, ValueError):
+                log.exception(f'Skipping malformed row {row} in language {lang}.')
 
     def translate_event(self, event, lang):
         entry = event.copy()
@@ -642,11 +880,20 @@ class TeamExpander:
         entry['type'] = _(entry['type'], lang)
         return entry
 
+    def populate_translated_campaign_tasks(self, languages):
+        for lang in languages:
+            self.translated_campaign_tasks[lang] = {
+                tier: [self.translate_campaign_task(t, lang) for t in tasks]
+                for tier, tasks in self.campaign_tasks.items()
+            }
+
+    @in_translation_scope
     def get_campaign_tasks(self, lang, _filter=None):
+        lang = self.canonical_language(lang)
         result = {'heading': f'{_("[CAMPAIGN]", lang)}: {_("[TASKS]", lang)}'}
         tiers = ['bronze', 'silver', 'gold']
         result['campaigns'] = {
-            _(f'[MEDAL_LEVEL_{i}]', lang): [self.translate_campaign_task(t, lang) for t in self.campaign_tasks[tier]]
+            _(f'[MEDAL_LEVEL_{i}]', lang): self.translated_campaign_tasks[lang][tier]
             for i, tier in enumerate(tiers) if _filter is None or tier.lower() == _filter.lower()
         }
         result['has_content'] = any([len(c) > 0 for c in result['campaigns'].values()])
@@ -689,18 +936,29 @@ class TeamExpander:
 
         return new_task
 
+    @in_translation_scope
     def get_spoilers(self, lang):
-        spoilers = []
         now = datetime.datetime.utcnow()
-        near_term_spoilers = [s for s in self.spoilers if now <= s['date'] <= now + datetime.timedelta(days=180)]
-        for spoiler in near_term_spoilers:
-            translated = self.translate_spoiler(spoiler, lang)
+        dates, spoilers = self.get_daily_rows('spoilers', now.date(), lang, self.build_spoiler_rows)
+        first = bisect.bisect_left(dates, now)
+        last = bisect.bisect_right(dates, now + self.SPOILER_WINDOW)
+        return spoilers[first:last]
+
+    def build_spoiler_rows(self, today, lang):
+        midnight = datetime.datetime.combine(today, datetime.time())
+        dates = []
+        spoilers = []
+        upcoming = self.spoiler_index.starting_between(midnight, midnight + self.SPOILER_WINDOW
+                                                       + datetime.timedelta(days=1))
+        for spoiler, translated in self.translate_rows(upcoming, self.translate_spoiler, lang):
             if translated:
+                dates.append(spoiler['date'])
                 spoilers.append(translated)
-        return spoilers
+        return dates, spoilers
 
     def translate_spoiler(self, spoiler, lang):
-        entry = getattr(self, spoiler['type'] + 's').get(spoiler['id'], {}).copy()
+        entities = getattr(self, self.ENTITY_KINDS.get(spoiler['type'], spoiler['type'] + 's'))
+        entry = entities.get(spoiler['id'], {}).copy()
         if not entry:
             return None
         entry['name'] = _(entry['name'], lang)
@@ -719,6 +977,7 @@ class TeamExpander:
             entry['kingdom'] = _(kingdom['name'], lang)
         return entry
 
+    @in_translation_scope
     def get_soulforge(self, lang):
         title = _('[SOULFORGE]', lang)
         craftable_items = {}
@@ -733,8 +992,8 @@ class TeamExpander:
         new_recipe['name'] = _(recipe['name'], lang)
         return new_recipe
 
-    @staticmethod
-    def translate_categories(categories, lang):
+    @in_translation_scope
+    def translate_categories(self, categories, lang):
         def try_different_translated_versions_because_devs_are_stupid(cat):
             lookup = f'[{cat.upper()}S]'
             result = _(lookup, lang)
@@ -745,9 +1004,16 @@ class TeamExpander:
         translated = [try_different_translated_versions_because_devs_are_stupid(c) for c in categories]
         return dict(zip(categories, translated))
 
+    @in_translation_scope
     def get_levels(self, lang):
         levels = [{
             'level': level['level'],
             'bonus': _(level['bonus'], lang),
         } for level in self.levels]
         return levels
+
+
+def build_team_expander():
+    start = time.perf_counter()
+    expander = TeamExpander(translations.Translations())
+    return expander, time.perf_counter() - start
@@ -0,0 +1,131 @@
+import collections
+import functools
+
+IGNORED_SEARCH_CHARACTERS = str.maketrans('', '', ' -\'’')
+
+
+def normalize_search_tag(text):
+    return text.translate(IGNORED_SEARCH_CHARACTERS).lower()
+
+
+@functools.lru_cache(maxsize=1024)
+def extract_search_tag(search_term):
+    return normalize_search_tag(search_term)
+
+
+def get_edit_distance(a, b, max_distance):
+    too_far = max_distance + 1
+    if abs(len(a) - len(b)) > max_distance:
+        return too_far
+    previous_row = list(range(len(b) + 1))
+    for i, char_a in enumerate(a, start=1):
+        first = max(1, i - max_distance)
+        last = min(len(b), i + max_distance)
+        current_row = [too_far] * (len(b) + 1)
+        if i <= max_distance:
+            current_row[0] = i
+        for j in range(first, last + 1):
+            current_row[j] = min(previous_row[j] + 1,
+                                 current_row[j - 1] + 1,
+                                 previous_row[j - 1] + (char_a != b[j - 1]))
+        if min(current_row[first - 1:last + 1]) > max_distance:
+            return too_far
+        previous_row = current_row
+    return min(previous_row[-1], too_far)
+
+
+class SearchIndex:
+    NGRAM_SIZE = 3
+    FUZZY_DISTANCES = ((5, 1), (10, 2))
+    FUZZY_MAX_DISTANCE = 3
+
+    def __init__(self):
+        self.names = {}
+        self.tags = {}
+        self.exact_matches = {}
+        self.ngrams = collections.defaultdict(set)
+        self.name_ngrams = collections.defaultdict(set)
+
+    def __len__(self):
+        return len(self.tags)
+
+    @classmethod
+    def get_ngrams(cls, tag):
+        return {tag[i:i + cls.NGRAM_SIZE] for i in range(len(tag) - cls.NGRAM_SIZE + 1)}
+
+    def add(self, _id, name, *fields):
+        name_tag = normalize_search_tag(name)
+        tags = (name_tag,) + tuple(normalize_search_tag(field) for field in fields)
+        self.names[_id] = (name, len(self.names))
+        self.tags[_id] = tags
+        self.exact_matches.setdefault(name_tag, _id)
+        for tag in tags:
+            for ngram in self.get_ngrams(tag):
+                self.ngrams[ngram].add(_id)
+        for ngram in self.get_ngrams(name_tag):
+            self.name_ngrams[ngram].add(_id)
+
+    def get_candidates(self, real_search):
+        if len(real_search) < self.NGRAM_SIZE:
+            return self.tags.keys()
+        postings = sorted((self.ngrams.get(ngram, set()) for ngram in self.get_ngrams(real_search)), key=len)
+        return set.intersection(*postings)
+
+    def get_name(self, _id):
+        return self.names[_id][0]
+
+    def get_tag(self, _id):
+        return self.tags[_id][0]
+
+    def get_tags(self, _id):
+        return self.tags[_id]
+
+    def find(self, real_search):
+        return {_id for _id in self.get_candidates(real_search)
+                if any(real_search in tag for tag in self.tags[_id])}
+
+    def match(self, search_term):
+        matches = self.find(extract_search_tag(search_term))
+        return sorted(matches, key=lambda _id: self.names[_id][1])
+
+    def search(self, search_term, extra_ids=()):
+        real_search = extract_search_tag(search_term)
+        if real_search in self.exact_matches:
+            return [self.exact_matches[real_search]]
+
+        matches = self.find(real_search)
+        matches.update(_id for _id in extra_ids if _id in self.names)
+        return self.sort(matches)
+
+    def sort(self, ids):
+        return sorted(ids, key=self.names.get)
+
+    @classmethod
+    def get_max_distance(cls, real_search):
+        for length, distance in cls.FUZZY_DISTANCES:
+            if len(real_search) <= length:
+                return distance
+        return cls.FUZZY_MAX_DISTANCE
+
+    def fuzzy_search(self, search_term):
+        real_search = extract_search_tag(search_term)
+        query_ngrams = self.get_ngrams(real_search)
+        if not query_ngrams:
+            return []
+
+        shared_ngrams = collections.Counter()
+        for ngram in query_ngrams:
+            shared_ngrams.update(self.name_ngrams.get(ngram, ()))
+
+        max_distance = self.get_max_distance(real_search)
+        matches = []
+        for _id, shared in shared_ngrams.most_common():
+            if shared < max(1, len(query_ngrams) - self.NGRAM_SIZE * max_distance):
+                break
+            distance = get_edit_distance(real_search, self.tags[_id][0], max_distance)
+            if distance < max_distance:
+                matches = []
+                max_distance = distance
+            if distance == max_distance:
+                matches.append(_id)
+        return self.sort(matches)
@@ -0,0 +1,59 @@
+import re
+
+PLACEHOLDER_PATTERN = re.compile(r'(\{\d\})')
+
+
+class SpellTemplate:
+    def __init__(self, name, cost, parts):
+        self.name = name
+        self.cost = cost
+        self.parts = tuple(parts)
+
+    def render(self):
+        return {
+            'name': self.name,
+            'cost': self.cost,
+            'description': ''.join(self.parts),
+        }
+
+    @classmethod
+    def compile(cls, spell, name, description, magic):
+        parts = PLACEHOLDER_PATTERN.split(description)
+        placeholders = {position: part for position, part in enumerate(parts) if position % 2}
+
+        def replace(placeholder, fragment):
+            for position in [p for p, remaining in placeholders.items() if remaining == placeholder]:
+                parts[position] = fragment
+                del placeholders[position]
+
+        for i, (multiplier, amount) in enumerate(spell['effects'], start=1):
+            spell_amount = f' + {amount}' if amount else ''
+            multiplier_text = ''
+            if multiplier > 1:
+                if multiplier == int(multiplier):
+                    multiplier_text = f'{multiplier:.0f} ⨯ '
+                else:
+                    multiplier_text = f'{multiplier} ⨯ '
+            divisor = ''
+            if multiplier < 1:
+                number = int(round(1 / multiplier))
+                divisor = f' / {number}'
+            damage = f'[{multiplier_text}{magic}{divisor}{spell_amount}]'
+            has_half_replacement = len(spell['effects']) == len(placeholders) - 1
+            if '{2}' in placeholders.values() and has_half_replacement:
+                multiplier *= 0.5
+                amount *= 0.5
+                if amount == int(amount):
+                    amount = int(amount)
+                half_damage = f'[{multiplier} ⨯ {magic}{divisor} + {amount}]'
+                replace('{1}', half_damage)
+                replace('{2}', damage)
+            else:
+                replace(f'{{{i}}}', damage)
+
+        if spell['boost'] and spell['boost'] > 100:
+            parts.append(f' [x{int(round(spell["boost"] / 100))}]')
+        elif spell['boost'] and spell['boost'] != 1 and spell['boost'] <= 100:
+            parts.append(f' [{100 / spell["boost"]:0.0f}:1]')
+
+        return cls(name, spell['cost'], [part for part in parts if part])
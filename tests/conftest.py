@@ -0,0 +1,215 @@
+import datetime
+import json
+import os
+
+import pytest
+
+from configurations import CONFIG
+
+LANGUAGE_PREFIXES = {
+    'English': '',
+    'French': 'fr ',
+    'German': 'de ',
+    'Russian': 'ru ',
+    'Italian': 'it ',
+    'Spanish': 'es ',
+    'Chinese': 'zh ',
+}
+GERMAN_NAMES = {
+    '[TROOP_6001_NAME]': 'Koboldkönig',
+    '[KINGDOM_3000_NAME]': 'Zerbrochene Spitze',
+}
+TALENT_TREES = ('Magic', 'Guardian', 'Mercenary')
+
+
+def mana_colors(*colors):
+    return {color: color in colors for color in
+            ('ColorBlue', 'ColorGreen', 'ColorRed', 'ColorYellow', 'ColorPurple', 'ColorBrown')}
+
+
+def release_date(days):
+    date = datetime.datetime(2021, 1, 1) + datetime.timedelta(days=days)
+    return date.strftime('%m/%d/%Y %I:%M:%S %p UTC')
+
+
+def timestamp(date):
+    return datetime.datetime.combine(date, datetime.time(), datetime.timezone.utc).timestamp()
+
+
+def build_world():
+    spells = [
+        {'Id': 101, 'Name': '[SPELL101_NAME]', 'Description': '[SPELL101_DESC]', 'Cost': 10,
+         'SpellSteps': [{'Type': 'Damage', 'SpellPowerMultiplier': 1, 'Amount': 2}]},
+        {'Id': 102, 'Name': '[SPELL102_NAME]', 'Description': '[SPELL102_DESC]', 'Cost': 12,
+         'SpellSteps': [{'Type': 'Damage', 'SpellPowerMultiplier': 2, 'Amount': 0},
+                        {'Type': 'CountGems', 'Amount': 200}]},
+        {'Id': 103, 'Name': '[SPELL103_NAME]', 'Description': '[SPELL103_DESC]', 'Cost': 8,
+         'SpellSteps': [{'Type': 'Heal', 'SpellPowerMultiplier': 0.5, 'Amount': 1}]},
+        {'Id': 104, 'Name': '[SPELL104_NAME]', 'Description': '[SPELL104_DESC]', 'Cost': 14,
+         'SpellSteps': [{'Type': 'Damage', 'SpellPowerMultiplier': 1, 'Amount': 4}]},
+        {'Id': 201, 'Name': '[SPELL201_NAME]', 'Description': '[SPELL201_DESC]', 'Cost': 0, 'SpellSteps': []},
+    ]
+    traits = [
+        {'Code': 'FireLink', 'Name': '[TRAIT_FIRELINK]', 'Description': '[TRAIT_FIRELINK_DESC]', 'Image': 'fire'},
+        {'Code': 'StoneSkin', 'Name': '[TRAIT_STONESKIN]', 'Description': '[TRAIT_STONESKIN_DESC]', 'Image': 'stone'},
+        {'Code': 'IceLink', 'Name': '[TRAIT_ICELINK]', 'Description': '[TRAIT_ICELINK_DESC]', 'Image': 'ice'},
+    ]
+    traits += [{'Code': f'{tree}{i}', 'Name': f'[TRAIT_{tree.upper()}{i}]', 'Description': f'[TRAIT_{tree.upper()}{i}_DESC]',
+                'Image': f'{tree}{i}'} for tree in TALENT_TREES for i in range(7)]
+    troops = [
+        {'Id': 6001, 'Name': '[TROOP_6001_NAME]', 'Description': '[TROOP_6001_DESC]', 'SpellId': 101,
+         'ManaColors': mana_colors('ColorRed', 'ColorBrown'), 'Traits': ['FireLink', 'StoneSkin'],
+         'TroopRarity': 'Legendary', 'TroopType': 'Goblin', 'TroopRoleArray': ['Warrior'], 'FileBase': 'Goblin'},
+        {'Id': 6002, 'Name': '[TROOP_6002_NAME]', 'Description': '[TROOP_6002_DESC]', 'SpellId': 102,
+         'ManaColors': mana_colors('ColorBrown'), 'Traits': ['StoneSkin'], 'TroopRarity': 'Rare',
+         'TroopType': 'Dwarf', 'TroopType2': 'Human', 'TroopRoleArray': ['Support'], 'FileBase': 'Dwarf'},
+        {'Id': 6003, 'Name': '[TROOP_6003_NAME]', 'Description': '[TROOP_6003_DESC]', 'SpellId': 103,
+         'ManaColors': mana_colors('ColorBlue'), 'Traits': ['IceLink'], 'TroopRarity': 'Mythic',
+         'TroopType': 'Dragon', 'TroopRoleArray': ['Mage'], 'FileBase': 'Dragon'},
+    ]
+    kingdoms = [
+        {'Id': 3000, 'Name': '[KINGDOM_3000_NAME]', 'Description': '[KINGDOM_3000_DESC]', 'ByLine': '[KINGDOM_3000_BY]',
+         'BannerName': '[BANNER_3000]', 'BannerColors': [1, 0, 2, -1, 0, 0, 0], 'FileBase': 'Spire',
+         'TroopIds': [6001, 6002, -1], 'ManaColors': mana_colors('ColorRed'), 'KingdomTroopType': 'Goblin'},
+        {'Id': 3001, 'Name': '[KINGDOM_3001_NAME]', 'Description': '[KINGDOM_3001_DESC]', 'ByLine': '[KINGDOM_3001_BY]',
+         'BannerName': '[BANNER_3001]', 'BannerColors': [0, 1, 0, 0, 2, 0, -1], 'FileBase': 'Storm',
+         'TroopIds': [6003], 'ManaColors': mana_colors('ColorBlue'), 'KingdomTroopType': 'Dragon'},
+    ]
+    weapons = [
+        {'Id': 1001, 'SpellId': 104, 'ManaColors': mana_colors('ColorRed'), 'WeaponRarity': 'Epic', 'Type': 'Sword',
+         'TroopRoleArray': ['Warrior'], 'KingdomId': 3000, 'MasteryRequirement': 1002, 'ArmorIncrease': [0, 1],
+         'AttackIncrease': [1, 0], 'HealthIncrease': [0, 0], 'SpellPowerIncrease': [0, 0], 'Affixes': [201]},
+    ]
+    pets = [
+        {'Id': 7001, 'Name': '[PET_7001_NAME]', 'ManaColors': mana_colors('ColorRed'), 'KingdomId': 3000,
+         'Effect': 2, 'EffectData': 3000, 'EffectTroopType': None, 'FileBase': 'Fluffy'},
+    ]
+    talent_trees = [{'Code': tree, 'Traits': [f'{tree}{i}' for i in range(7)]} for tree in TALENT_TREES]
+    classes = [
+        {'Id': 12001, 'Name': '[HEROCLASS_WIZARD_NAME]', 'Code': 'Wizard', 'TalentTrees': list(TALENT_TREES),
+         'Traits': ['FireLink', 'IceLink', 'StoneSkin'], 'ClassWeaponId': 1001, 'KingdomId': 3000,
+         'Augment': ['Mage'], 'BonusColor': 'blue', 'BonusWeapon': 'red'},
+    ]
+    return {'Spells': spells, 'Traits': traits, 'Troops': troops, 'Kingdoms': kingdoms, 'Weapons': weapons,
+            'Pets': pets, 'TalentTrees': talent_trees, 'HeroClasses': classes}
+
+
+def build_campaign_tasks(kingdom_id):
+    return {level: [{'Id': f'Campaign_{kingdom_id}_{level}_{n}', 'Rewards': [{'Amount': 5}], 'Task': 'Battle',
+                     'TaskName': '[TASK_WIN_BATTLES]', 'TaskTitle': '[TASK_TITLE]', 'Tag': 'battle',
+                     'XValue': 3, 'YValue': 'troops', 'CValue': 'Goblin', 'DValue': 'K00'} for n in range(2)]
+            for level in ('Bronze', 'Silver', 'Gold')}
+
+
+def build_user_data():
+    monday = datetime.date.today() - datetime.timedelta(days=datetime.date.today().weekday())
+    return {
+        'pEconomyModel': {
+            'TroopReleaseDates': [{'TroopId': 6001, 'Date': release_date(0)},
+                                  {'TroopId': 6003, 'Date': release_date(10)}],
+            'PetReleaseDates': [{'PetId': 7001, 'Date': release_date(5)}],
+            'KingdomReleaseDates': [{'KingdomId': 3000, 'Date': release_date(0)}],
+            'HeroClassReleaseDates': [{'QuestId': 12001, 'Date': release_date(1)}],
+            'RoomReleaseDates': [],
+            'WeaponReleaseDates': [{'WeaponId': 1001, 'Date': release_date(2)}],
+            'KingdomLevelData': {'3000': {'Color': 2, 'Stat': 'Attack'}},
+            'FactionRenownRewardPetIds': {},
+            'Explore_RunePerKingdom': {'3000': [1]},
+            'HeroLevelUpStats': [{'Level': 1, 'Stat': 'Attack'}, {'Level': 2, 'Stat': 'Armor'}],
+        },
+        'BasicLiveEventArray': [
+            {'GachaTroop': 6001, 'StartDate': timestamp(monday), 'Type': 1, 'Name': 'Bounty', 'Kingdom': 3001,
+             'EndDate': timestamp(monday + datetime.timedelta(days=7))},
+        ],
+        'pTasksData': {'CampaignTasks': {'3000': build_campaign_tasks(3000), '3001': build_campaign_tasks(3001)}},
+        'pTraitsTable': [
+            {'Troop': 6001, 'Runes': [[{'Id': 1, 'Required': 2}], [{'Id': 2, 'Required': 3}]]},
+            {'Troop': 6003, 'Runes': [[{'Id': 2, 'Required': 1}]]},
+            {'ClassCode': 'Wizard', 'Runes': [[{'Id': 1, 'Required': 4}]]},
+        ],
+    }
+
+
+def build_translations():
+    english = {
+        '[TROOP_6001_NAME]': 'Goblin King',
+        '[TROOP_6001_DESC]': 'Rules the goblins',
+        '[TROOP_6002_NAME]': 'Dwarf Miner',
+        '[TROOP_6002_DESC]': 'Digs deep',
+        '[TROOP_6003_NAME]': 'Ice Dragon',
+        '[TROOP_6003_DESC]': 'Freezes everything',
+        '[KINGDOM_3000_NAME]': 'Broken Spire',
+        '[KINGDOM_3000_DESC]': 'A broken tower',
+        '[KINGDOM_3000_BY]': 'Goblins everywhere',
+        '[KINGDOM_3001_NAME]': 'Stormheim',
+        '[KINGDOM_3001_DESC]': 'Cold and windy',
+        '[KINGDOM_3001_BY]': 'Brr',
+        '[BANNER_3000]': 'Spire Banner',
+        '[BANNER_3001]': 'Storm Banner',
+        '[SPELL101_NAME]': 'Goblin Smash',
+        '[SPELL101_DESC]': 'Deal {1} damage.',
+        '[SPELL102_NAME]': 'Rock Throw',
+        '[SPELL102_DESC]': 'Deal {1} damage to an enemy.',
+        '[SPELL103_NAME]': 'Frost Breath',
+        '[SPELL103_DESC]': 'Heal {1} life.',
+        '[SPELL104_NAME]': 'Flame Sword',
+        '[SPELL104_DESC]': 'Deal {1} damage.',
+        '[SPELL201_NAME]': 'Burning',
+        '[SPELL201_DESC]': 'Burns the target.',
+        '[TRAIT_FIRELINK]': 'Fire Link',
+        '[TRAIT_FIRELINK_DESC]': 'Gain fire gems',
+        '[TRAIT_STONESKIN]': 'Stone Skin',
+        '[TRAIT_STONESKIN_DESC]': 'Takes less damage',
+        '[TRAIT_ICELINK]': 'Ice Link',
+        '[TRAIT_ICELINK_DESC]': 'Gain ice gems',
+        '[PET_7001_NAME]': 'Fluffy',
+        '[HEROCLASS_WIZARD_NAME]': 'Wizard',
+        '[RUNE01_NAME]': 'Minor Fire Stone',
+        '[RUNE02_NAME]': 'Major Earth Stone',
+        '[MAGIC]': 'Magic',
+        '[TROOPS]': 'Troops',
+        '[CLASS]': 'Class',
+        '[KINGDOMS]': 'Kingdoms',
+        '[BOUNTY]': 'Bounty',
+        '[TASK_WIN_BATTLES]': 'Win {0} battles',
+        '[TASK_TITLE]': 'Campaign task',
+    }
+    for tree in TALENT_TREES:
+        english[f'[TALENT_TREE_{tree.upper()}]'] = f'{tree} Tree'
+        for i in range(7):
+            english[f'[TRAIT_{tree.upper()}{i}]'] = f'{tree} Talent {i}'
+            english[f'[TRAIT_{tree.upper()}{i}_DESC]'] = f'{tree} bonus {i}'
+    tables = {}
+    for language, prefix in LANGUAGE_PREFIXES.items():
+        tables[language] = {key: f'{prefix}{value}' for key, value in english.items()}
+    tables['German'].update(GERMAN_NAMES)
+    return tables
+
+
+def write_json(folder, filename, data):
+    with open(os.path.join(folder, filename), 'w', encoding='utf8') as f:
+        json.dump(data, f, ensure_ascii=False)
+
+
+def write_game_assets(folder, world=None, user_data=None, translations=None):
+    write_json(folder, 'World.json', world or build_world())
+    write_json(folder, 'User.json', user_data or build_user_data())
+    write_json(folder, 'Campaign.json', {f'Campaign{level}': [] for level in ('Bronze', 'Silver', 'Gold')})
+    write_json(folder, 'Soulforge.json', {'pRecipeArray': []})
+    for language, table in (translations or build_translations()).items():
+        write_json(folder, f'GemsOfWar_{language}.json', table)
+
+
+@pytest.fixture
+def game_assets(tmp_path, monkeypatch):
+    write_game_assets(str(tmp_path))
+    monkeypatch.setitem(CONFIG.raw_config, 'game_assets_folder', str(tmp_path))
+    monkeypatch.setitem(CONFIG.raw_config, 'game_data_snapshot', '')
+    monkeypatch.setitem(CONFIG.raw_config, 'game_data_workers', 1)
+    return tmp_path
+
+
+@pytest.fixture
+def expander(game_assets):
+    import search
+    return search.TeamExpander(search.translations.Translations())
@@ -0,0 +1,14 @@
+from data_source.population_pipeline import format_timings
+from embed_fields import MAX_FIELD_LENGTH, split_lines_into_fields
+
+
+def test_long_timing_tables_are_split_into_fields():
+    timings = [{'stage': f'stage_{i}', 'seconds': i / 1000, 'count': i, 'thread': f'ThreadPoolExecutor-0_{i}'}
+               for i in range(60)]
+    lines = format_timings(timings)
+    fields = split_lines_into_fields(lines, 'Stage timings')
+
+    assert len(fields) > 1
+    assert fields[0]['name'] == 'Stage timings'
+    assert all(len(field['value']) <= MAX_FIELD_LENGTH for field in fields)
+    assert ''.join(field['value'].strip('`') for field in fields) == '\n'.join(lines) + '\n'
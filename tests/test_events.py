@@ -0,0 +1,53 @@
+import datetime
+
+import pytest
+
+from conftest import build_user_data, timestamp, write_json
+
+
+def event(days, event_type, gacha=None, kingdom=None):
+    start = datetime.date.today() + datetime.timedelta(days=days)
+    return {'GachaTroop': gacha, 'StartDate': timestamp(start), 'EndDate': timestamp(start + datetime.timedelta(days=2)),
+            'Type': event_type, 'Name': '', 'Kingdom': kingdom}
+
+
+@pytest.fixture
+def events_assets(game_assets):
+    user_data = build_user_data()
+    user_data['BasicLiveEventArray'] += [
+        event(1, 4, gacha=6001),
+        event(2, 6, gacha=6001),
+        event(3, 7, kingdom='3001'),
+        event(4, 7, kingdom=3001),
+    ]
+    write_json(str(game_assets), 'User.json', user_data)
+    return game_assets
+
+
+def test_events_are_translated_at_the_day_boundary(events_assets):
+    import search
+    expander = search.TeamExpander(search.translations.Translations())
+    day, rows = expander.daily_rows['events']
+    assert day == datetime.date.today()
+    assert list(rows) == list(search.translations.CANONICAL_LANGUAGES)
+    assert list(expander.daily_rows['spoilers'][1]) == list(search.translations.CANONICAL_LANGUAGES)
+
+    events = expander.get_events('de')
+    assert [(e['type'], e['extra_info']) for e in events] == [('de Bounty', 'Koboldkönig'),
+                                                              ('[DELVE_EVENT]', 'de Stormheim')]
+    assert events is rows['de']
+
+
+def test_malformed_events_are_logged(events_assets, caplog):
+    import search
+    search.TeamExpander(search.translations.Translations())
+    skipped = [r for r in caplog.records if r.message.startswith('Skipping malformed row')]
+    assert len(skipped) == 2 * len(search.translations.CANONICAL_LANGUAGES)
+    assert {r.message.rsplit(' ', 1)[-1] for r in skipped} == {f'{lang}.'
+                                                               for lang in search.translations.CANONICAL_LANGUAGES}
+    assert all(r.exc_info for r in skipped)
+
+
+def test_malformed_events_are_skipped_on_reload(expander, events_assets):
+    reloaded = expander.reload(['User.json'])
+    assert [e['extra_info'] for e in reloaded.get_events('en')] == ['Goblin King', 'Stormheim']
@@ -0,0 +1,81 @@
+import os
+
+import pytest
+
+from conftest import build_user_data, write_json
+from file_watcher import FileWatcher
+from game_assets import GameAssets
+
+DATASETS = {'World.json': 'World', 'User.json': 'User', 'Campaign.json': 'Campaign'}
+
+
+def loaded_hashes():
+    return {filename: GameAssets.hash(filename) for filename in DATASETS}
+
+
+def touch_user_data(game_assets, name):
+    user_data = build_user_data()
+    user_data['BasicLiveEventArray'][0]['Name'] = name
+    write_json(str(game_assets), 'User.json', user_data)
+
+
+@pytest.fixture
+def watcher(game_assets):
+    file_watcher = FileWatcher(DATASETS, 0, loaded_hashes())
+    yield file_watcher
+    file_watcher.close()
+
+
+def test_unchanged_files_are_not_reported(watcher):
+    assert watcher.poll() == {}
+    assert watcher.poll() == {}
+
+
+def test_changes_since_loading_are_reported(game_assets):
+    hashes = loaded_hashes()
+    touch_user_data(game_assets, 'Changed before the watcher started')
+    file_watcher = FileWatcher(DATASETS, 0, hashes)
+    try:
+        assert list(file_watcher.poll()) == ['User.json']
+    finally:
+        file_watcher.close()
+
+
+def test_changes_stay_pending_until_accepted(watcher, game_assets):
+    watcher.poll()
+    touch_user_data(game_assets, 'First change')
+    os.utime(GameAssets.path('User.json'), ns=(1, 1))
+    changed = watcher.poll()
+    assert list(changed) == ['User.json']
+
+    write_json(str(game_assets), 'Campaign.json', {'CampaignBronze': [{'Id': 'changed'}]})
+    os.utime(GameAssets.path('Campaign.json'), ns=(1, 1))
+    assert list(watcher.poll()) == ['Campaign.json', 'User.json']
+
+    watcher.accept(loaded_hashes())
+    assert watcher.poll() == {}
+    touch_user_data(game_assets, 'Second change')
+    os.utime(GameAssets.path('User.json'), ns=(2, 2))
+    assert list(watcher.poll()) == ['User.json']
+
+
+def test_close_releases_inotify(watcher):
+    inotify = watcher.inotify
+    watcher.close()
+    assert watcher.inotify is None
+    if inotify:
+        assert inotify.fd == -1
+    watcher.close()
+
+
+def test_expander_records_the_hashes_it_loaded(expander, game_assets):
+    file_hashes = expander.file_hashes
+    assert file_hashes['World.json'] == GameAssets.hash('World.json')
+    assert file_hashes['User.json'] == GameAssets.hash('User.json')
+    assert file_hashes['GemsOfWar_German.json'] == GameAssets.hash('GemsOfWar_German.json')
+
+    touch_user_data(game_assets, 'Reloaded')
+    reloaded = expander.reload(['User.json'])
+    assert reloaded.file_hashes['User.json'] == GameAssets.hash('User.json')
+    assert reloaded.file_hashes['World.json'] == file_hashes['World.json']
+    assert expander.file_hashes['User.json'] == file_hashes['User.json']
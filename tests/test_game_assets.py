@@ -0,0 +1,53 @@
+import io
+import json
+
+import pytest
+
+from game_assets import GameAssets, JsonSectionReader
+
+
+def sections(document, chunk_size=3):
+    reader = JsonSectionReader(io.StringIO(document))
+    reader.CHUNK_SIZE = chunk_size
+    return [(key, list(elements)) for key, elements in reader.sections()]
+
+
+DOCUMENT = {
+    'Troops': [{'Id': 6001, 'Name': 'Goblin King', 'Traits': ['FireLink']}, {'Id': 6002}],
+    'Version': 1.25,
+    'Empty': [],
+    'Numbers': [1, -2.5e3, 12345678, True, None, 'text, with ] and }'],
+    'Settings': {'Nested': [1, 2]},
+}
+
+
+@pytest.mark.parametrize('chunk_size', [1, 3, 7, 64 * 1024])
+def test_sections_match_json_load(chunk_size):
+    document = json.dumps(DOCUMENT, indent=2)
+    assert sections(document, chunk_size) == [
+        ('Troops', DOCUMENT['Troops']),
+        ('Empty', []),
+        ('Numbers', DOCUMENT['Numbers']),
+    ]
+
+
+def test_unread_elements_are_skipped():
+    reader = JsonSectionReader(io.StringIO(json.dumps(DOCUMENT)))
+    keys = [key for key, _ in reader.sections()]
+    assert keys == ['Troops', 'Empty', 'Numbers']
+
+
+def test_empty_document():
+    assert sections('{ }') == []
+
+
+@pytest.mark.parametrize('document', ['[1, 2]', '{"Troops": [1, 2', '{"Troops": [1 2]}'])
+def test_malformed_documents(document):
+    with pytest.raises(ValueError):
+        sections(document)
+
+
+def test_stream_sections_reads_game_files(game_assets):
+    world = GameAssets.load('World.json')
+    streamed = {key: list(elements) for key, elements in GameAssets.stream_sections('World.json')}
+    assert streamed == {key: value for key, value in world.items() if isinstance(value, list)}
@@ -0,0 +1,107 @@
+from conftest import build_translations, build_world, write_json
+
+
+def write_world(game_assets, change):
+    world = build_world()
+    change(world)
+    write_json(str(game_assets), 'World.json', world)
+
+
+def find(entries, key, value):
+    return next(entry for entry in entries if entry[key] == value)
+
+
+def test_modified_troop_is_patched(expander, game_assets):
+    def change(world):
+        troop = find(world['Troops'], 'Id', 6002)
+        troop['Traits'] = ['FireLink']
+        troop['SpellId'] = 101
+
+    write_world(game_assets, change)
+    reloaded = expander.reload(['World.json'])
+
+    troop = reloaded.translate_entity('troop', 6002, 'en')
+    assert [trait['name'] for trait in troop['traits']] == ['Fire Link']
+    assert troop['spell']['name'] == 'Goblin Smash'
+    assert reloaded.trait_troop_ids['FireLink'] == [6001, 6002]
+    assert reloaded.trait_troop_ids['StoneSkin'] == [6001]
+    assert reloaded.troops[6002]['kingdom'] is reloaded.kingdoms[3000]
+    assert reloaded.version > expander.version
+    assert expander.troops[6002]['spell_id'] == 102
+    assert expander.translate_entity('troop', 6002, 'en')['spell']['name'] == 'Rock Throw'
+
+
+def test_modified_trait_propagates_to_linked_sections(expander, game_assets):
+    def change(world):
+        find(world['Traits'], 'Code', 'StoneSkin')['Description'] = '[TRAIT_ICELINK_DESC]'
+        find(world['Traits'], 'Code', 'Magic0')['Name'] = '[TRAIT_FIRELINK]'
+
+    assert expander.search_talent('fire link', 'en') == []
+    write_world(game_assets, change)
+    reloaded = expander.reload(['World.json'])
+
+    troop = reloaded.translate_entity('troop', 6002, 'en')
+    assert troop['traits'][0]['description'] == 'Gain ice gems'
+    _class = reloaded.translate_entity('class', 12001, 'en')
+    assert _class['traits'][2]['description'] == 'Gain ice gems'
+    assert [tree['name'] for tree in reloaded.search_talent('fire link', 'en')] == ['Magic Tree']
+    assert [tree['name'] for tree in reloaded.search_talent('fire link', 'de')] == ['de Magic Tree']
+    assert expander.search_talent('fire link', 'en') == []
+
+
+def test_added_entry_needs_a_full_rebuild(expander, game_assets):
+    def change(world):
+        world['Troops'].append(dict(find(world['Troops'], 'Id', 6003), Id=6004))
+
+    write_world(game_assets, change)
+    assert expander.reload(['World.json']) is None
+    assert 6004 not in expander.troops
+
+
+def test_removed_entry_needs_a_full_rebuild(expander, game_assets):
+    def change(world):
+        world['Pets'] = []
+
+    write_world(game_assets, change)
+    assert expander.reload(['World.json']) is None
+    assert 7001 in expander.pets
+
+
+def test_failed_patch_leaves_the_world_untouched(expander, game_assets):
+    world = expander.world
+
+    def change(world):
+        find(world['Spells'], 'Id', 101)['Cost'] = 99
+        find(world['Troops'], 'Id', 6001)['TroopRarity'] = 'Mythic'
+
+    write_world(game_assets, change)
+    assert expander.reload(['World.json']) is None
+    assert expander.world is world
+    assert expander.spells[101]['cost'] == 10
+    assert expander.translate_spell(101, 'en')['cost'] == 10
+    assert expander.troops[6001]['rarity'] == 'Legendary'
+
+
+def test_language_reload_leaves_the_running_expander_alone(expander, game_assets):
+    import search
+    tables = build_translations()
+    tables['German']['[TROOP_6001_NAME]'] = 'Goblinkönig'
+    write_json(str(game_assets), 'GemsOfWar_German.json', tables['German'])
+
+    reloaded = expander.reload(['GemsOfWar_German.json'])
+    assert expander.translations.get('[TROOP_6001_NAME]', 'de') == 'Koboldkönig'
+    assert reloaded.search_troop('Goblinkönig', 'de')[0]['name'] == 'Goblinkönig'
+    assert reloaded.get_team_from_message('6001', 'de')['troops'] == [['brownred', 'Goblinkönig']]
+    assert reloaded.translations.tables['English'] is not expander.translations.tables['English']
+
+    with search.translations_in_scope(reloaded.translations):
+        assert expander.search_troop('Koboldkönig', 'de')[0]['name'] == 'Koboldkönig'
+        assert expander.translate_entity('troop', 6002, 'de')['name'] == 'de Dwarf Miner'
+        assert expander.translate_entity('kingdom', 3000, 'de')['troops'][0]['name'] == 'Koboldkönig'
+
+
+def test_time_dependent_refresh_skips_a_running_reload(expander):
+    expander.time_dependent_days = None
+    with expander.refresh_lock:
+        assert expander.refresh_time_dependent_data() is False
+    assert expander.refresh_time_dependent_data() is True
@@ -0,0 +1,45 @@
+from configurations import CONFIG
+from data_source import game_data_snapshot
+from data_source.game_data_snapshot import load_game_data, read_snapshot, write_snapshot
+
+
+def test_snapshot_round_trip(game_assets, tmp_path):
+    path = str(tmp_path / 'game_data.snapshot')
+    hashes = game_data_snapshot.hash_input_files()
+    world = game_data_snapshot.build_game_data()
+    write_snapshot(path, hashes, world)
+
+    loaded = read_snapshot(path, hashes)
+    assert repr(loaded.troops) == repr(world.troops)
+    assert loaded.troops[6001]['traits'][0] is loaded.traits['FireLink']
+    assert loaded.kingdoms.keys() == world.kingdoms.keys()
+    assert loaded.talent_trees['Magic']['talents'][0].name == '[TRAIT_MAGIC0]'
+    assert loaded.campaign_tasks == world.campaign_tasks
+    assert loaded.data is None
+
+
+def test_snapshot_is_ignored_when_inputs_or_version_change(game_assets, tmp_path, monkeypatch):
+    path = str(tmp_path / 'game_data.snapshot')
+    hashes = game_data_snapshot.hash_input_files()
+    write_snapshot(path, hashes, game_data_snapshot.build_game_data())
+
+    assert read_snapshot(path, dict(hashes, **{'World.json': 'changed'})) is None
+    monkeypatch.setattr(game_data_snapshot, 'SNAPSHOT_VERSION', 'outdated')
+    assert read_snapshot(path, hashes) is None
+
+
+def test_unreadable_snapshot_is_rebuilt(game_assets, tmp_path, monkeypatch):
+    path = tmp_path / 'game_data.snapshot'
+    path.write_bytes(b'not a pickle')
+    monkeypatch.setitem(CONFIG.raw_config, 'game_data_snapshot', str(path))
+
+    world = load_game_data()
+    assert world.population_timings[0]['stage'] != 'snapshot'
+    world = load_game_data()
+    assert world.population_timings[0]['stage'] == 'snapshot'
+    assert 6001 in world.troops
+
+
+def test_snapshot_version_follows_the_data_source_code():
+    assert game_data_snapshot.SNAPSHOT_VERSION == game_data_snapshot.get_snapshot_version()
+    assert len(game_data_snapshot.SNAPSHOT_VERSION) == 40
@@ -0,0 +1,58 @@
+import pytest
+
+import search
+from conftest import build_world, write_json
+
+
+def names(results):
+    return [result['name'] for result in results]
+
+
+@pytest.mark.parametrize('search_term, lang, troop_id, name', [
+    ('Goblin King', 'en', 6001, 'Goblin King'),
+    ('koboldkönig', 'en', 6001, 'Goblin King'),
+    ('Goblin King', 'de', 6001, 'Koboldkönig'),
+    ('Koboldkönig', 'fr', 6001, 'fr Goblin King'),
+    ('de Ice', 'en', 6003, 'Ice Dragon'),
+])
+def test_troops_are_found_across_languages(expander, search_term, lang, troop_id, name):
+    results = expander.search_troop(search_term, lang)
+    assert [(result['id'], result['name']) for result in results] == [(troop_id, name)]
+
+
+def test_own_language_matches_win(expander):
+    assert names(expander.search_troop('Ice', 'de')) == ['de Ice Dragon']
+
+
+def test_language_aliases_share_the_canonical_indexes(expander):
+    assert list(expander.search_indexes) == search.translations.CANONICAL_LANGUAGES
+    assert list(expander.team_elements) == search.translations.CANONICAL_LANGUAGES
+    assert expander.get_search_index('troop', 'ру') is expander.get_search_index('troop', 'ru')
+    assert names(expander.search_troop('Goblin King', 'ру')) == ['ru Goblin King']
+    assert names(expander.search_troop('Goblin King', 'cn')) == ['zh Goblin King']
+
+
+def test_talent_search(expander):
+    assert names(expander.search_talent('Guardian Talent 2', 'en')) == ['Guardian Tree']
+    results = expander.search_talent('talent 3', 'en')
+    assert names(results) == ['Guardian Tree', 'Magic Tree', 'Mercenary Tree']
+    assert results[1]['talent_matches'] == ['magictalent3']
+
+
+def test_traitstone_search(expander):
+    assert names(expander.search_traitstone('fire', 'en')) == ['Minor Fire Stone']
+    assert names(expander.search_traitstone('stone', 'de')) == ['de Major Earth Stone', 'de Minor Fire Stone']
+
+
+def test_trait_search_lists_every_user_of_a_trait(game_assets):
+    world = build_world()
+    world['TalentTrees'][1]['Traits'][0] = 'StoneSkin'
+    write_json(str(game_assets), 'World.json', world)
+    expander = search.TeamExpander(search.translations.Translations())
+
+    assert expander.world.trait_class_ids['StoneSkin'] == [12001]
+    assert expander.world.trait_talent_trees['StoneSkin'] == ['Guardian']
+    [trait] = expander.search_trait('Stone Skin', 'de')
+    assert [troop['name'] for troop in trait['troops']] == ['Koboldkönig', 'de Dwarf Miner']
+    assert [_class['name'] for _class in trait['classes']] == ['de Wizard']
+    assert [tree['name'] for tree in trait['talent_trees']] == ['de Guardian Tree']
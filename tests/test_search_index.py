@@ -0,0 +1,83 @@
+import pytest
+
+from search_index import SearchIndex, extract_search_tag, get_edit_distance
+
+
+def build_index():
+    index = SearchIndex()
+    index.add(1, 'Goblin King', 'Goblin', 'Broken Spire')
+    index.add(2, 'Goblin Shaman', 'Goblin')
+    index.add(3, 'Ice Dragon', 'Dragon')
+    index.add(4, "Dwarf-Miner's Pick")
+    return index
+
+
+@pytest.mark.parametrize('search_term, tag', [
+    ('Goblin King', 'goblinking'),
+    ("Dwarf-Miner's Pick", 'dwarfminerspick'),
+    ('Brother’s Keeper', 'brotherskeeper'),
+    ('ÜBER', 'über'),
+])
+def test_extract_search_tag(search_term, tag):
+    assert extract_search_tag(search_term) == tag
+
+
+@pytest.mark.parametrize('a, b, max_distance, distance', [
+    ('goblin', 'goblin', 1, 0),
+    ('goblin', 'gobin', 1, 1),
+    ('goblin', 'golbin', 2, 2),
+    ('goblin', 'gobiln', 2, 2),
+    ('goblin', 'dragon', 2, 3),
+    ('goblin', 'goblinking', 2, 3),
+    ('', 'abc', 3, 3),
+])
+def test_get_edit_distance(a, b, max_distance, distance):
+    assert get_edit_distance(a, b, max_distance) == distance
+
+
+def test_search_exact_match_wins():
+    assert build_index().search('goblin king') == [1]
+
+
+def test_search_substring_in_any_tag():
+    index = build_index()
+    assert index.search('goblin') == [1, 2]
+    assert index.search('spire') == [1]
+    assert index.search('dragon') == [3]
+    assert index.search('miners') == [4]
+    assert index.search('unknown') == []
+
+
+def test_search_short_terms_scan_all_tags():
+    index = build_index()
+    assert index.search('ic') == [4, 3]
+    assert index.search('g') == [1, 2, 3]
+
+
+def test_search_results_are_sorted_by_name():
+    index = build_index()
+    assert index.search('dragon', extra_ids=(2, 99)) == [2, 3]
+
+
+def test_match_ignores_exact_matches():
+    index = build_index()
+    index.add(5, 'Goblin')
+    assert index.search('goblin') == [5]
+    assert index.match('goblin') == [1, 2, 5]
+
+
+def test_fuzzy_search_prefers_closest_names():
+    index = build_index()
+    assert index.fuzzy_search('Goblin Kign') == [1]
+    assert index.fuzzy_search('Ice Dargon') == [3]
+    assert index.fuzzy_search('Goblin Shamen') == [2]
+    assert index.fuzzy_search('zz') == []
+    assert index.fuzzy_search('Completely Different') == []
+
+
+def test_get_tags():
+    index = build_index()
+    assert index.get_name(1) == 'Goblin King'
+    assert index.get_tag(1) == 'goblinking'
+    assert index.get_tags(1) == ('goblinking', 'goblin', 'brokenspire')
+    assert len(index) == 4
@@ -0,0 +1,37 @@
+import pytest
+
+from spell_template import SpellTemplate
+
+
+def compile_spell(description, effects, boost=0):
+    spell = {'cost': 10, 'effects': effects, 'boost': boost}
+    return SpellTemplate.compile(spell, 'Spell', description, 'Magic').render()['description']
+
+
+@pytest.mark.parametrize('description, effects, boost, rendered', [
+    ('Deal {1} damage.', [[1, 2]], 0, 'Deal [Magic + 2] damage.'),
+    ('Deal {1} damage.', [[3, 0]], 0, 'Deal [3 ⨯ Magic] damage.'),
+    ('Deal {1} damage.', [[1.5, 1]], 0, 'Deal [1.5 ⨯ Magic + 1] damage.'),
+    ('Heal {1} life.', [[0.5, 1]], 0, 'Heal [Magic / 2 + 1] life.'),
+    ('Deal {1} then {2}.', [[1, 1], [2, 0]], 0, 'Deal [Magic + 1] then [2 ⨯ Magic].'),
+    ('Deal {1}, splash {2}.', [[2, 4]], 0, 'Deal [1.0 ⨯ Magic + 2], splash [2 ⨯ Magic + 4].'),
+    ('Deal {1} damage.', [[1, 0]], 300, 'Deal [Magic] damage. [x3]'),
+    ('Deal {1} damage.', [[1, 0]], 50, 'Deal [Magic] damage. [2:1]'),
+    ('No placeholders.', [], 0, 'No placeholders.'),
+])
+def test_compile(description, effects, boost, rendered):
+    assert compile_spell(description, effects, boost) == rendered
+
+
+def test_render_returns_fresh_dicts():
+    template = SpellTemplate.compile({'cost': 7, 'effects': [], 'boost': 0}, 'Spell', 'Text', 'Magic')
+    first = template.render()
+    first['description'] = 'changed'
+    assert template.render() == {'name': 'Spell', 'cost': 7, 'description': 'Text'}
+
+
+def test_translate_spell(expander):
+    assert expander.translate_spell(101, 'en') == {'name': 'Goblin Smash', 'cost': 10,
+                                                   'description': 'Deal [Magic + 2] damage.'}
+    assert expander.translate_spell(102, 'en')['description'] == 'Deal [2 ⨯ Magic] damage to an enemy. [x2]'
+    assert expander.translate_spell(103, 'de')['description'] == 'de Heal [de Magic / 2 + 1] life.'
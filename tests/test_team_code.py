@@ -0,0 +1,35 @@
+def test_team_with_class_and_weapon(expander):
+    team = expander.get_team_from_message('6001,6002,1001,12001,3000,1,2,0,3,1,1,2', 'en')
+    assert team['troops'] == [['brownred', 'Goblin King'], ['brown', 'Dwarf Miner'],
+                              ['red', 'Flame Sword :crossed_swords:']]
+    assert team['banner']['name'] == 'Spire Banner'
+    assert team['class'] == 'Wizard'
+    assert team['talents'] == ['Magic Talent 0', 'Guardian Talent 1', '-', 'Mercenary Talent 3',
+                               'Magic Talent 4', 'Magic Talent 5', 'Guardian Talent 6']
+
+
+def test_team_without_weapon_drops_class(expander):
+    team = expander.get_team_from_message('6001,,6003,12001', 'de')
+    assert team['troops'] == [['brownred', 'Koboldkönig'], ['blue', 'de Ice Dragon']]
+    assert team['banner'] == {}
+    assert team['class'] is None
+    assert team['talents'] is None
+    assert team['troops_title'] == 'de Troops'
+
+
+def test_team_lookups_do_not_leak_between_teams(expander):
+    first = expander.get_team_from_message('6001', 'en')
+    first['troops'][0][1] = 'changed'
+    assert expander.get_team_from_message('6001', 'en')['troops'] == [['brownred', 'Goblin King']]
+
+
+def test_empty_team_code(expander):
+    assert expander.get_team_from_message('', 'en') is None
+
+
+def test_batch_decodes_every_team_code(expander):
+    teams = expander.get_teams_from_messages(['6001,6002', '', '6003'], 'de')
+    assert [team['troops'] for team in teams] == [[['brownred', 'Koboldkönig'], ['brown', 'de Dwarf Miner']],
+                                                  [['blue', 'de Ice Dragon']]]
+    assert expander.get_teams_from_codes([[6001], [6003]], 'en') == [
+        expander.get_team_from_code([6001], 'en'), expander.get_team_from_code([6003], 'en')]
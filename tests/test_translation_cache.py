@@ -0,0 +1,46 @@
+import pytest
+
+from translation_cache import TranslationCache
+
+
+def translate():
+    return {'name': 'Goblin King', 'roles': ['Warrior'], 'banner': {'colors': [('red', 1)]}}
+
+
+def test_cached_views_are_deeply_frozen():
+    cache = TranslationCache(10)
+    view = cache.get('troop', 1, 'en', translate)
+    with pytest.raises(TypeError):
+        view['name'] = 'changed'
+    with pytest.raises(AttributeError):
+        view['roles'].append('Mage')
+    with pytest.raises(TypeError):
+        view['banner']['colors'] = []
+    assert view['roles'] == ('Warrior',)
+    assert view['banner']['colors'] == (('red', 1),)
+
+
+def test_cache_hits_share_views():
+    cache = TranslationCache(10)
+    view = cache.get('troop', 1, 'en', translate)
+    assert cache.get('troop', 1, 'en', translate) is view
+    assert cache.info() == {'size': 1, 'max_size': 10, 'hits': 1, 'misses': 1}
+
+
+def test_cache_evicts_least_recently_used():
+    cache = TranslationCache(2)
+    cache.get('troop', 1, 'en', translate)
+    cache.get('troop', 2, 'en', translate)
+    cache.get('troop', 1, 'en', translate)
+    cache.get('troop', 3, 'en', translate)
+    cache.get('troop', 1, 'en', translate)
+    assert cache.info()['hits'] == 2
+    assert len(cache) == 2
+
+
+def test_cached_entities_do_not_leak_into_game_data(expander):
+    kingdom = expander.translate_entity('kingdom', 3000, 'en')
+    assert kingdom['troop_ids'] == (6001, 6002)
+    with pytest.raises(AttributeError):
+        kingdom['troop_ids'].append(6003)
+    assert expander.kingdoms[3000]['troop_ids'] == [6001, 6002]
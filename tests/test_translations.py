@@ -0,0 +1,55 @@
+import translations
+from conftest import build_translations, write_json
+
+
+def test_languages_are_loaded_on_first_use(game_assets):
+    shared = translations.Translations()
+    assert shared.tables == {}
+    assert shared.get('[TROOP_6001_NAME]', 'de') == 'Koboldkönig'
+    assert list(shared.tables) == ['German']
+
+
+def test_aliases_share_tables(game_assets):
+    shared = translations.Translations()
+    assert shared.get('[TROOP_6001_NAME]', 'ру') == 'ru Goblin King'
+    assert shared.get('[TROOP_6001_NAME]', 'cn') == 'zh Goblin King'
+    assert shared.get('[TROOP_6001_NAME]', 'ru') == 'ru Goblin King'
+    assert list(shared.tables) == ['Russian', 'Chinese']
+    assert shared._translations['ру'] is shared._translations['ru']
+
+
+def test_unknown_languages_and_keys(game_assets):
+    shared = translations.Translations()
+    assert shared.get('[TROOP_6001_NAME]', 'xx') == 'Goblin King'
+    assert shared.get('[TROOP_6001_NAME]') == 'Goblin King'
+    assert shared.get('[UNKNOWN_KEY]', 'de') == '[UNKNOWN_KEY]'
+
+
+def test_languages_share_one_key_table(game_assets):
+    tables = build_translations()
+    tables['German']['[ONLY_IN_GERMAN]'] = 'Nur auf Deutsch'
+    write_json(str(game_assets), 'GemsOfWar_German.json', tables['German'])
+
+    shared = translations.Translations()
+    assert shared.get('[ONLY_IN_GERMAN]', 'en') == '[ONLY_IN_GERMAN]'
+    assert shared.get('[ONLY_IN_GERMAN]', 'de') == 'Nur auf Deutsch'
+    assert shared.get('[ONLY_IN_GERMAN]', 'en') == '[ONLY_IN_GERMAN]'
+    assert shared.get('[ONLY_IN_GERMAN]', 'fr') == '[ONLY_IN_GERMAN]'
+    assert len(shared.keys) == len(shared.slots)
+    assert all(len(values) == len(shared.keys) for values in shared.tables.values())
+
+
+def test_reload_keeps_unchanged_languages(game_assets):
+    previous = translations.Translations()
+    previous.get('[TROOP_6001_NAME]', 'en')
+    previous.get('[TROOP_6001_NAME]', 'de')
+
+    tables = build_translations()
+    tables['German']['[TROOP_6001_NAME]'] = 'Goblinkönig'
+    write_json(str(game_assets), 'GemsOfWar_German.json', tables['German'])
+
+    reloaded = translations.Translations(previous, ['de'])
+    assert list(reloaded.tables) == ['English']
+    assert reloaded.get('[TROOP_6001_NAME]', 'de') == 'Goblinkönig'
+    assert previous.get('[TROOP_6001_NAME]', 'de') == 'Koboldkönig'
+    assert reloaded.tables['English'] is not previous.tables['English']
@@ -0,0 +1,47 @@
+import collections
+import types
+
+from data_source.base_game_data import BaseGameData
+
+
+def freeze(value):
+    if isinstance(value, (dict, BaseGameData)):
+        return types.MappingProxyType({key: freeze(item) for key, item in value.items()})
+    if isinstance(value, (list, tuple)):
+        return tuple(freeze(item) for item in value)
+    return value
+
+
+class TranslationCache:
+    def __init__(self, max_size):
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._views = collections.OrderedDict()
+
+    def __len__(self):
+        return len(self._views)
+
+    def get(self, kind, _id, lang, translate):
+        key = (kind, _id, lang)
+        view = self._views.get(key)
+        if view is not None:
+            self.hits += 1
+            self._views.move_to_end(key)
+            return view
+
+        self.misses += 1
+        view = freeze(translate())
+        if self.max_size > 0:
+            self._views[key] = view
+            if len(self._views) > self.max_size:
+                self._views.popitem(last=False)
+        return view
+
+    def info(self):
+        return {
+            'size': len(self._views),
+            'max_size': self.max_size,
+            'hits': self.hits,
+            'misses': self.misses,
+        }
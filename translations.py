@@ -1,7 +1,23 @@
+import logging
+import sys
+import threading
+import time
+
 import humanize
 
 from game_assets import GameAssets
 
+LOGLEVEL = logging.DEBUG
+
+formatter = logging.Formatter('%(asctime)-15s [%(levelname)s] %(message)s')
+handler = logging.StreamHandler()
+handler.setFormatter(formatter)
+handler.setLevel(LOGLEVEL)
+log = logging.getLogger(__name__)
+
+log.setLevel(LOGLEVEL)
+log.addHandler(handler)
+
 LANGUAGES = {
     'en': 'English',
     'fr': 'French',
@@ -19,23 +35,77 @@ LANGUAGE_CODE_MAPPING = {
     'cn': 'zh',
 }
 
+CANONICAL_LANGUAGES = [lang for lang in LANGUAGES if lang not in LANGUAGE_CODE_MAPPING]
+
 LANG_FILES = [f'GemsOfWar_{language}.json' for language in LANGUAGES.values()]
 
 
 class Translations:
     BASE_LANG = 'en'
 
-    def __init__(self):
+    def __init__(self, previous=None, changed_languages=()):
+        self.lock = threading.Lock()
+        self.slots = {}
+        self.keys = []
+        self.tables = {}
+        self.load_times = {}
+        self.file_hashes = {}
         self._translations = {}
-        for lang_code, language in LANGUAGES.items():
-            self._translations[lang_code] = GameAssets.load(
-                f'GemsOfWar_{language}.json')
+        if previous:
+            with previous.lock:
+                self.slots = dict(previous.slots)
+                self.keys = list(previous.keys)
+                changed = {LANGUAGES[lang] for lang in changed_languages}
+                for language, values in previous.tables.items():
+                    if language not in changed:
+                        self.add_table(language, list(values), previous.load_times[language])
+                        filename = f'GemsOfWar_{language}.json'
+                        self.file_hashes[filename] = previous.file_hashes[filename]
 
     def get(self, key, lang=''):
-        if lang not in self._translations:
-            lang = self.BASE_LANG
+        values = self._translations.get(lang)
+        if values is None:
+            if lang in LANGUAGES:
+                values = self.load(lang)
+            else:
+                values = self._translations[lang] = self.load(self.BASE_LANG)
+        slot = self.slots.get(key)
+        if slot is None:
+            return key
+        return values[slot]
+
+    def load(self, lang):
+        language = LANGUAGES[lang]
+        with self.lock:
+            if language in self.tables:
+                return self.tables[language]
+            start = time.perf_counter()
+            filename = f'GemsOfWar_{language}.json'
+            self.file_hashes[filename] = GameAssets.hash(filename)
+            values = self.build_values(GameAssets.load(filename))
+            load_time = time.perf_counter() - start
+            self.add_table(language, values, load_time)
+            log.debug(f'Loaded {language} translations in {load_time:.3f}s.')
+            return values
+
+    def build_values(self, table):
+        new_keys = [sys.intern(key) for key in table if key not in self.slots]
+        for values in self.tables.values():
+            values.extend(new_keys)
+        for key in new_keys:
+            self.slots[key] = len(self.keys)
+            self.keys.append(key)
+        values = list(self.keys)
+        for key, value in table.items():
+            values[self.slots[key]] = value
+        return values
 
-        return self._translations[lang].get(key, key)
+    def add_table(self, language, values, load_time):
+        self.tables[language] = values
+        self.load_times[language] = load_time
+        for lang_code, lang_language in LANGUAGES.items():
+            if lang_language == language:
+                self._translations[lang_code] = values
 
 
 class HumanizeTranslator:
@@ -27,7 +27,7 @@ def flatten(*args):
     for arg in args:
         if type(arg) == str and arg != '':
             lst.append(arg)
-        elif type(arg) == list:
+        elif type(arg) in (list, tuple):
             lst.extend(arg)
     return lst
 
@@ -1,6 +1,9 @@
+import os
+
 import discord
-from jinja2 import Environment, FileSystemLoader
+from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader, TemplateSyntaxError
 
+from base_bot import log
 from configurations import CONFIG
 from game_constants import RARITY_COLORS
 from search import _
@@ -14,20 +17,37 @@ class Views:
 
     def __init__(self, emojis):
         self.my_emojis = emojis
-        self.jinja_env = Environment(loader=FileSystemLoader('templates'))
-
-    def banner_colors(self, banner):
-        return [f'{self.my_emojis.get(d[0], f":{d[0]}:")}{abs(d[1]) * f"{d[1]:+d}"[0]}' for d in banner['colors']]
-
-    def render_embed(self, embed, template_name, **kwargs):
-        self.jinja_env.filters['emoji'] = self.my_emojis.get
+        bytecode_cache = None
+        if CONFIG.get('template_bytecode_cache'):
+            os.makedirs(CONFIG.get('template_bytecode_cache'), exist_ok=True)
+            bytecode_cache = FileSystemBytecodeCache(CONFIG.get('template_bytecode_cache'))
+        self.jinja_env = Environment(loader=FileSystemLoader('templates'), bytecode_cache=bytecode_cache,
+                                     auto_reload=False)
+        self.jinja_env.filters['emoji'] = self.emoji
         self.jinja_env.filters['banner_colors'] = self.banner_colors
         self.jinja_env.globals.update({
-            'emoji': self.my_emojis.get,
+            'emoji': self.emoji,
             'flatten': flatten
         })
+        self.templates = self.load_templates()
 
-        template = self.jinja_env.get_template(template_name)
+    def load_templates(self):
+        templates = {}
+        for name in self.jinja_env.list_templates(extensions=['jinja']):
+            try:
+                templates[name] = self.jinja_env.get_template(name)
+            except TemplateSyntaxError as e:
+                log.warning(f'Could not compile template {name}: {e}.')
+        return templates
+
+    def emoji(self, name, default=None):
+        return self.my_emojis.get(name, default)
+
+    def banner_colors(self, banner):
+        return [f'{self.my_emojis.get(d[0], f":{d[0]}:")}{abs(d[1]) * f"{d[1]:+d}"[0]}' for d in banner['colors']]
+
+    def render_embed(self, embed, template_name, **kwargs):
+        template = self.templates.get(template_name) or self.jinja_env.get_template(template_name)
         content = template.render(**kwargs)
 
         for i, splitted in enumerate(content.split('<T>')):